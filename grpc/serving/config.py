@@ -8,6 +8,12 @@ RABBITMQ_HOST = config("RABBITMQ_HOST", default="localhost", cast=str)
 RABBITMQ_PORT = config("RABBITMQ_PORT", default=5672, cast=int)
 GRPC_CONSUMER_QUEUE = config("GRPC_CONSUMER_QUEUE")
 GRPC_PRODUCER_QUEUE = config("GRPC_PRODUCER_QUEUE")
+GRPC_INFERENCE_QUEUE = config("GRPC_INFERENCE_QUEUE", default="")
+GRPC_INFERENCE_TIMEOUT = config("GRPC_INFERENCE_TIMEOUT", default=300, cast=float)
 
 GRPC_HOST = config("GRPC_HOST", default="localhost", cast=str)
 GRPC_PORT = config("GRPC_PORT", default=50051, cast=int)
+GRPC_IO_WORKERS = config("GRPC_IO_WORKERS", default=16, cast=int)
+GRPC_MAX_WATCHERS = config("GRPC_MAX_WATCHERS", default=4, cast=int)
+GRPC_RESULTS_CHUNK_SIZE = config("GRPC_RESULTS_CHUNK_SIZE", default=10000, cast=int)
+GRPC_RESULT_CACHE_MB = config("GRPC_RESULT_CACHE_MB", default=256, cast=int)
@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x66orecasting.proto\"\x0e\n\x0c\x45mptyRequest\"\x18\n\x06Models\x12\x0e\n\x06models\x18\x01 \x03(\t\"\x1e\n\tModelName\x12\x11\n\tmodelName\x18\x01 \x01(\t\"*\n\x0cTrainingInfo\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x63onfig\x18\x02 \x01(\t\"\"\n\x06Target\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\"$\n\x06Status\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\"\x13\n\x05JobID\x12\n\n\x02id\x18\x01 \x01(\t\"@\n\tTimestamp\x12\x11\n\ttimestamp\x18\x01 \x01(\x03\x12\x12\n\nmodel_name\x18\x02 \x01(\t\x12\x0c\n\x04kind\x18\x03 \x01(\t\"f\n\x08Progress\x12\n\n\x02id\x18\x01 \x01(\t\x12!\n\x04\x64\x61ta\x18\x02 \x03(\x0b\x32\x13.Progress.DataEntry\x1a+\n\tDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xda\x01\n\x0bPredictions\x12\x32\n\x0bpredictions\x18\x01 \x03(\x0b\x32\x1d.Predictions.PredictionsEntry\x12\x30\n\nevaluation\x18\x02 \x03(\x0b\x32\x1c.Predictions.EvaluationEntry\x1a\x32\n\x10PredictionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\x1a\x31\n\x0f\x45valuationEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x7f\n\x07Results\x12\x0e\n\x06target\x18\x01 \x01(\t\x12&\n\x07metrics\x18\x02 \x03(\x0b\x32\x15.Results.MetricsEntry\x1a<\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1b\n\x05value\x18\x02 \x01(\x0b\x32\x0c.Predictions:\x02\x38\x01\"\'\n\nAllResults\x12\x19\n\x07results\x18\x01 \x03(\x0b\x32\x08.Results\"q\n\tInference\x12\x30\n\x0bpredictions\x18\x01 \x03(\x0b\x32\x1b.Inference.PredictionsEntry\x1a\x32\n\x10PredictionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"C\n\tModelInfo\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x12\n\nmodel_name\x18\x02 \x01(\t\x12\x0e\n\x06target\x18\x03 \x01(\t\"\x18\n\x06Report\x12\x0e\n\x06report\x18\x01 \x01(\t2\xd2\x02\n\nRouteGuide\x12)\n\rStartTraining\x12\r.TrainingInfo\x1a\x07.Status\"\x00\x12\"\n\x0bGetProgress\x12\x06.JobID\x1a\t.Progress\"\x00\x12/\n\x18GetSpecificTargetResults\x12\x07.Target\x1a\x08.Results\"\x00\x12-\n\x14GetAllTargetsResults\x12\x06.JobID\x1a\x0b.AllResults\"\x00\x12(\n\x0cGetInference\x12\n.Timestamp\x1a\n.Inference\"\x00\x12\"\n\tSaveModel\x12\n.ModelInfo\x1a\x07.Status\"\x00\x12#\n\tGetModels\x12\r.EmptyRequest\x1a\x07.Models\x12\"\n\x0b\x44\x65leteModel\x12\n.ModelName\x1a\x07.Reportb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x66orecasting.proto\"\x0e\n\x0c\x45mptyRequest\"\x18\n\x06Models\x12\x0e\n\x06models\x18\x01 \x03(\t\"\x1e\n\tModelName\x12\x11\n\tmodelName\x18\x01 \x01(\t\"*\n\x0cTrainingInfo\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06\x63onfig\x18\x02 \x01(\t\"P\n\x06Target\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x16\n\x0e\x66rom_timestamp\x18\x03 \x01(\x03\x12\x14\n\x0cto_timestamp\x18\x04 \x01(\x03\"$\n\x06Status\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\"\x13\n\x05JobID\x12\n\n\x02id\x18\x01 \x01(\t\"@\n\tTimestamp\x12\x11\n\ttimestamp\x18\x01 \x01(\x03\x12\x12\n\nmodel_name\x18\x02 \x01(\t\x12\x0c\n\x04kind\x18\x03 \x01(\t\"f\n\x08Progress\x12\n\n\x02id\x18\x01 \x01(\t\x12!\n\x04\x64\x61ta\x18\x02 \x03(\x0b\x32\x13.Progress.DataEntry\x1a+\n\tDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xb3\x01\n\x0eProgressUpdate\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06target\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x16\n\x0erows_processed\x18\x04 \x01(\x03\x12\x11\n\twatermark\x18\x05 \x01(\t\x12\x17\n\x0frows_per_second\x18\x06 \x01(\x01\x12\x11\n\ttimestamp\x18\x07 \x01(\t\x12\x1e\n\x16memory_high_water_mark\x18\x08 \x01(\x03\"\xda\x01\n\x0bPredictions\x12\x32\n\x0bpredictions\x18\x01 \x03(\x0b\x32\x1d.Predictions.PredictionsEntry\x12\x30\n\nevaluation\x18\x02 \x03(\x0b\x32\x1c.Predictions.EvaluationEntry\x1a\x32\n\x10PredictionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\x1a\x31\n\x0f\x45valuationEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x7f\n\x07Results\x12\x0e\n\x06target\x18\x01 \x01(\t\x12&\n\x07metrics\x18\x02 \x03(\x0b\x32\x15.Results.MetricsEntry\x1a<\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1b\n\x05value\x18\x02 \x01(\x0b\x32\x0c.Predictions:\x02\x38\x01\"\'\n\nAllResults\x12\x19\n\x07results\x18\x01 \x03(\x0b\x32\x08.Results\"\x8a\x02\n\x0cResultsChunk\x12\x0e\n\x06target\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\t\x12\x33\n\x0bpredictions\x18\x03 \x03(\x0b\x32\x1e.ResultsChunk.PredictionsEntry\x12\x31\n\nevaluation\x18\x04 \x03(\x0b\x32\x1d.ResultsChunk.EvaluationEntry\x12\x0c\n\x04last\x18\x05 \x01(\x08\x1a\x32\n\x10PredictionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\x1a\x31\n\x0f\x45valuationEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"q\n\tInference\x12\x30\n\x0bpredictions\x18\x01 \x03(\x0b\x32\x1b.Inference.PredictionsEntry\x1a\x32\n\x10PredictionsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"C\n\tModelInfo\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x12\n\nmodel_name\x18\x02 \x01(\t\x12\x0e\n\x06target\x18\x03 \x01(\t\"\x18\n\x06Report\x12\x0e\n\x06report\x18\x01 \x01(\t2\xe9\x03\n\nRouteGuide\x12)\n\rStartTraining\x12\r.TrainingInfo\x1a\x07.Status\"\x00\x12\"\n\x0bGetProgress\x12\x06.JobID\x1a\t.Progress\"\x00\x12,\n\rWatchProgress\x12\x06.JobID\x1a\x0f.ProgressUpdate\"\x00\x30\x01\x12/\n\x18GetSpecificTargetResults\x12\x07.Target\x1a\x08.Results\"\x00\x12-\n\x14GetAllTargetsResults\x12\x06.JobID\x1a\x0b.AllResults\"\x00\x12\x31\n\x13StreamTargetResults\x12\x07.Target\x1a\r.ResultsChunk\"\x00\x30\x01\x12\x34\n\x17StreamAllTargetsResults\x12\x06.JobID\x1a\r.ResultsChunk\"\x00\x30\x01\x12(\n\x0cGetInference\x12\n.Timestamp\x1a\n.Inference\"\x00\x12\"\n\tSaveModel\x12\n.ModelInfo\x1a\x07.Status\"\x00\x12#\n\tGetModels\x12\r.EmptyRequest\x1a\x07.Models\x12\"\n\x0b\x44\x65leteModel\x12\n.ModelName\x1a\x07.Reportb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -29,6 +29,10 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_PREDICTIONS_EVALUATIONENTRY']._serialized_options = b'8\001'
   _globals['_RESULTS_METRICSENTRY']._options = None
   _globals['_RESULTS_METRICSENTRY']._serialized_options = b'8\001'
+  _globals['_RESULTSCHUNK_PREDICTIONSENTRY']._options = None
+  _globals['_RESULTSCHUNK_PREDICTIONSENTRY']._serialized_options = b'8\001'
+  _globals['_RESULTSCHUNK_EVALUATIONENTRY']._options = None
+  _globals['_RESULTSCHUNK_EVALUATIONENTRY']._serialized_options = b'8\001'
   _globals['_INFERENCE_PREDICTIONSENTRY']._options = None
   _globals['_INFERENCE_PREDICTIONSENTRY']._serialized_options = b'8\001'
   _globals['_EMPTYREQUEST']._serialized_start=21
@@ -40,37 +44,45 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_TRAININGINFO']._serialized_start=95
   _globals['_TRAININGINFO']._serialized_end=137
   _globals['_TARGET']._serialized_start=139
-  _globals['_TARGET']._serialized_end=173
-  _globals['_STATUS']._serialized_start=175
-  _globals['_STATUS']._serialized_end=211
-  _globals['_JOBID']._serialized_start=213
-  _globals['_JOBID']._serialized_end=232
-  _globals['_TIMESTAMP']._serialized_start=234
-  _globals['_TIMESTAMP']._serialized_end=298
-  _globals['_PROGRESS']._serialized_start=300
-  _globals['_PROGRESS']._serialized_end=402
-  _globals['_PROGRESS_DATAENTRY']._serialized_start=359
-  _globals['_PROGRESS_DATAENTRY']._serialized_end=402
-  _globals['_PREDICTIONS']._serialized_start=405
-  _globals['_PREDICTIONS']._serialized_end=623
-  _globals['_PREDICTIONS_PREDICTIONSENTRY']._serialized_start=522
-  _globals['_PREDICTIONS_PREDICTIONSENTRY']._serialized_end=572
-  _globals['_PREDICTIONS_EVALUATIONENTRY']._serialized_start=574
-  _globals['_PREDICTIONS_EVALUATIONENTRY']._serialized_end=623
-  _globals['_RESULTS']._serialized_start=625
-  _globals['_RESULTS']._serialized_end=752
-  _globals['_RESULTS_METRICSENTRY']._serialized_start=692
-  _globals['_RESULTS_METRICSENTRY']._serialized_end=752
-  _globals['_ALLRESULTS']._serialized_start=754
-  _globals['_ALLRESULTS']._serialized_end=793
-  _globals['_INFERENCE']._serialized_start=795
-  _globals['_INFERENCE']._serialized_end=908
-  _globals['_INFERENCE_PREDICTIONSENTRY']._serialized_start=522
-  _globals['_INFERENCE_PREDICTIONSENTRY']._serialized_end=572
-  _globals['_MODELINFO']._serialized_start=910
-  _globals['_MODELINFO']._serialized_end=977
-  _globals['_REPORT']._serialized_start=979
-  _globals['_REPORT']._serialized_end=1003
-  _globals['_ROUTEGUIDE']._serialized_start=1006
-  _globals['_ROUTEGUIDE']._serialized_end=1344
+  _globals['_TARGET']._serialized_end=219
+  _globals['_STATUS']._serialized_start=221
+  _globals['_STATUS']._serialized_end=257
+  _globals['_JOBID']._serialized_start=259
+  _globals['_JOBID']._serialized_end=278
+  _globals['_TIMESTAMP']._serialized_start=280
+  _globals['_TIMESTAMP']._serialized_end=344
+  _globals['_PROGRESS']._serialized_start=346
+  _globals['_PROGRESS']._serialized_end=448
+  _globals['_PROGRESS_DATAENTRY']._serialized_start=405
+  _globals['_PROGRESS_DATAENTRY']._serialized_end=448
+  _globals['_PROGRESSUPDATE']._serialized_start=451
+  _globals['_PROGRESSUPDATE']._serialized_end=630
+  _globals['_PREDICTIONS']._serialized_start=633
+  _globals['_PREDICTIONS']._serialized_end=851
+  _globals['_PREDICTIONS_PREDICTIONSENTRY']._serialized_start=750
+  _globals['_PREDICTIONS_PREDICTIONSENTRY']._serialized_end=800
+  _globals['_PREDICTIONS_EVALUATIONENTRY']._serialized_start=802
+  _globals['_PREDICTIONS_EVALUATIONENTRY']._serialized_end=851
+  _globals['_RESULTS']._serialized_start=853
+  _globals['_RESULTS']._serialized_end=980
+  _globals['_RESULTS_METRICSENTRY']._serialized_start=920
+  _globals['_RESULTS_METRICSENTRY']._serialized_end=980
+  _globals['_ALLRESULTS']._serialized_start=982
+  _globals['_ALLRESULTS']._serialized_end=1021
+  _globals['_RESULTSCHUNK']._serialized_start=1024
+  _globals['_RESULTSCHUNK']._serialized_end=1290
+  _globals['_RESULTSCHUNK_PREDICTIONSENTRY']._serialized_start=750
+  _globals['_RESULTSCHUNK_PREDICTIONSENTRY']._serialized_end=800
+  _globals['_RESULTSCHUNK_EVALUATIONENTRY']._serialized_start=802
+  _globals['_RESULTSCHUNK_EVALUATIONENTRY']._serialized_end=851
+  _globals['_INFERENCE']._serialized_start=1292
+  _globals['_INFERENCE']._serialized_end=1405
+  _globals['_INFERENCE_PREDICTIONSENTRY']._serialized_start=750
+  _globals['_INFERENCE_PREDICTIONSENTRY']._serialized_end=800
+  _globals['_MODELINFO']._serialized_start=1407
+  _globals['_MODELINFO']._serialized_end=1474
+  _globals['_REPORT']._serialized_start=1476
+  _globals['_REPORT']._serialized_end=1500
+  _globals['_ROUTEGUIDE']._serialized_start=1503
+  _globals['_ROUTEGUIDE']._serialized_end=1992
 # @@protoc_insertion_point(module_scope)
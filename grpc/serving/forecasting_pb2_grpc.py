@@ -29,6 +29,11 @@ class RouteGuideStub(object):
                 request_serializer=forecasting__pb2.JobID.SerializeToString,
                 response_deserializer=forecasting__pb2.Progress.FromString,
                 )
+        self.WatchProgress = channel.unary_stream(
+                '/RouteGuide/WatchProgress',
+                request_serializer=forecasting__pb2.JobID.SerializeToString,
+                response_deserializer=forecasting__pb2.ProgressUpdate.FromString,
+                )
         self.GetSpecificTargetResults = channel.unary_unary(
                 '/RouteGuide/GetSpecificTargetResults',
                 request_serializer=forecasting__pb2.Target.SerializeToString,
@@ -39,6 +44,16 @@ class RouteGuideStub(object):
                 request_serializer=forecasting__pb2.JobID.SerializeToString,
                 response_deserializer=forecasting__pb2.AllResults.FromString,
                 )
+        self.StreamTargetResults = channel.unary_stream(
+                '/RouteGuide/StreamTargetResults',
+                request_serializer=forecasting__pb2.Target.SerializeToString,
+                response_deserializer=forecasting__pb2.ResultsChunk.FromString,
+                )
+        self.StreamAllTargetsResults = channel.unary_stream(
+                '/RouteGuide/StreamAllTargetsResults',
+                request_serializer=forecasting__pb2.JobID.SerializeToString,
+                response_deserializer=forecasting__pb2.ResultsChunk.FromString,
+                )
         self.GetInference = channel.unary_unary(
                 '/RouteGuide/GetInference',
                 request_serializer=forecasting__pb2.Timestamp.SerializeToString,
@@ -85,6 +100,14 @@ class RouteGuideServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchProgress(self, request, context):
+        """Watch the progress of a specific job
+        Return: Stream of status changes and batch progress of each target until the job ends
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetSpecificTargetResults(self, request, context):
         """Get results for a specific target of a job
         Return: Model evaluation metrics and predictions for the selected target
@@ -101,6 +124,22 @@ class RouteGuideServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTargetResults(self, request, context):
+        """Stream the results for a specific target of a job in chunks of predictions
+        Return: Model evaluation metrics in the first chunk, followed by the predictions
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamAllTargetsResults(self, request, context):
+        """Stream the results for all targets of a job in chunks of predictions
+        Return: The chunks of every target column, one target after the other
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetInference(self, request, context):
         """Get inference for a specific timestamp and model
         Return: Predictions for a specific timestamp
@@ -146,6 +185,11 @@ def add_RouteGuideServicer_to_server(servicer, server):
                     request_deserializer=forecasting__pb2.JobID.FromString,
                     response_serializer=forecasting__pb2.Progress.SerializeToString,
             ),
+            'WatchProgress': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchProgress,
+                    request_deserializer=forecasting__pb2.JobID.FromString,
+                    response_serializer=forecasting__pb2.ProgressUpdate.SerializeToString,
+            ),
             'GetSpecificTargetResults': grpc.unary_unary_rpc_method_handler(
                     servicer.GetSpecificTargetResults,
                     request_deserializer=forecasting__pb2.Target.FromString,
@@ -156,6 +200,16 @@ def add_RouteGuideServicer_to_server(servicer, server):
                     request_deserializer=forecasting__pb2.JobID.FromString,
                     response_serializer=forecasting__pb2.AllResults.SerializeToString,
             ),
+            'StreamTargetResults': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTargetResults,
+                    request_deserializer=forecasting__pb2.Target.FromString,
+                    response_serializer=forecasting__pb2.ResultsChunk.SerializeToString,
+            ),
+            'StreamAllTargetsResults': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamAllTargetsResults,
+                    request_deserializer=forecasting__pb2.JobID.FromString,
+                    response_serializer=forecasting__pb2.ResultsChunk.SerializeToString,
+            ),
             'GetInference': grpc.unary_unary_rpc_method_handler(
                     servicer.GetInference,
                     request_deserializer=forecasting__pb2.Timestamp.FromString,
@@ -225,6 +279,23 @@ class RouteGuide(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def WatchProgress(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/RouteGuide/WatchProgress',
+            forecasting__pb2.JobID.SerializeToString,
+            forecasting__pb2.ProgressUpdate.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetSpecificTargetResults(request,
             target,
@@ -259,6 +330,40 @@ class RouteGuide(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StreamTargetResults(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/RouteGuide/StreamTargetResults',
+            forecasting__pb2.Target.SerializeToString,
+            forecasting__pb2.ResultsChunk.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamAllTargetsResults(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/RouteGuide/StreamAllTargetsResults',
+            forecasting__pb2.JobID.SerializeToString,
+            forecasting__pb2.ResultsChunk.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def GetInference(request,
             target,
@@ -0,0 +1,181 @@
+import asyncio
+from concurrent import futures
+
+import config
+from more_utils.logging import configure_logger
+from serving.grpc_route import WATCH_QUEUE_SIZE, RouteGuideServicer, shared_lock
+
+from grpc import StatusCode
+
+LOGGER = configure_logger(logger_name="GRPC_Server", package_name=None)
+
+
+class AbortError(Exception):
+    def __init__(self, code, details):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class BlockingContext:
+    """
+    Lets the synchronous RPC handlers run against an asyncio servicer context,
+    where `abort` is a coroutine and can not be called from a worker thread.
+    """
+
+    def __init__(self, context) -> None:
+        self.context = context
+
+    def abort(self, code, details):
+        raise AbortError(code, details)
+
+    def __getattr__(self, name):
+        return getattr(self.context, name)
+
+
+class AsyncRouteGuideServicer(RouteGuideServicer):
+    """
+    RouteGuide servicer for a grpc.aio server.
+
+    RPCs that only touch the in-memory job state are answered on the event loop.
+    RPCs that read result files or publish to the Message Broker run on a
+    bounded executor, so they never block the event loop. Responses from the
+    Message Broker are consumed on a thread and handed over to the event loop.
+    """
+
+    def __init__(
+        self, rabbitmq_context, data_dir, config_dir, inference_context=None
+    ) -> None:
+        super().__init__(rabbitmq_context, data_dir, config_dir, inference_context)
+        self.loop = None
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=config.GRPC_IO_WORKERS, thread_name_prefix="grpc-io"
+        )
+
+    def handle_response(self, message):
+        self.loop.call_soon_threadsafe(super().handle_response, message)
+
+    def resolve_inference(self, future, message):
+        if future.done():
+            return False
+        future.set_result(message)
+        return True
+
+    async def call(self, method, request, context, blocking=False):
+        try:
+            if blocking:
+                return await self.loop.run_in_executor(
+                    self.executor, method, request, BlockingContext(context)
+                )
+            return method(request, BlockingContext(context))
+        except AbortError as e:
+            await context.abort(e.code, e.details)
+
+    async def iterate(self, method, request, context):
+        iterator = method(request, BlockingContext(context))
+        future = None
+        try:
+            while True:
+                future = self.executor.submit(next, iterator, None)
+                item = await asyncio.wrap_future(future)
+                if item is None:
+                    break
+                yield item
+        except AbortError as e:
+            await context.abort(e.code, e.details)
+        finally:
+            if future is not None and not future.done():
+                # cancelled while next() runs on the executor, which can not be
+                # interrupted, so the iterator is closed once it returns
+                future.add_done_callback(lambda _: iterator.close())
+            else:
+                iterator.close()
+
+    async def StartTraining(self, request, context):
+        return await self.call(super().StartTraining, request, context, blocking=True)
+
+    async def GetProgress(self, request, context):
+        return await self.call(super().GetProgress, request, context)
+
+    async def WatchProgress(self, request, context):
+        job_id = request.id
+        updates = asyncio.Queue(maxsize=WATCH_QUEUE_SIZE)
+        current = self.add_watcher(job_id, updates)
+        if current is None:
+            await context.abort(StatusCode.INVALID_ARGUMENT, "Not a valid job id")
+
+        # the handler task is cancelled by grpc.aio if the client goes away
+        try:
+            for update in current:
+                yield update
+            while not (self.is_finished(job_id) and updates.empty()):
+                try:
+                    yield await asyncio.wait_for(updates.get(), timeout=1)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.remove_watcher(job_id, updates)
+
+    async def GetSpecificTargetResults(self, request, context):
+        return await self.call(
+            super().GetSpecificTargetResults, request, context, blocking=True
+        )
+
+    async def GetAllTargetsResults(self, request, context):
+        return await self.call(
+            super().GetAllTargetsResults, request, context, blocking=True
+        )
+
+    async def StreamTargetResults(self, request, context):
+        async for chunk in self.iterate(super().StreamTargetResults, request, context):
+            yield chunk
+
+    async def StreamAllTargetsResults(self, request, context):
+        async for chunk in self.iterate(
+            super().StreamAllTargetsResults, request, context
+        ):
+            yield chunk
+
+    async def SaveModel(self, request, context):
+        return await self.call(super().SaveModel, request, context, blocking=True)
+
+    async def GetModels(self, request, context):
+        return await self.call(super().GetModels, request, context)
+
+    async def DeleteModel(self, request, context):
+        return await self.call(super().DeleteModel, request, context)
+
+    async def GetInference(self, request, context):
+        run_configs = self.create_inference_configs(request)
+        if run_configs is None:
+            # return empty response if model not exist
+            await context.abort(
+                StatusCode.INVALID_ARGUMENT,
+                "Model does not exist. Training still in progress or you did not call SaveModel.",
+            )
+        inference_id = run_configs["inference_id"]
+
+        # resolved on the event loop once the worker answers, the handler task
+        # is cancelled by grpc.aio if the client goes away
+        future = self.loop.create_future()
+        with shared_lock:
+            self.inferences[inference_id] = future
+
+        try:
+            await self.loop.run_in_executor(
+                self.executor, self.publish_inference, run_configs
+            )
+            message = await asyncio.wait_for(
+                future, timeout=self.get_inference_timeout(context)
+            )
+        except asyncio.TimeoutError:
+            await context.abort(StatusCode.DEADLINE_EXCEEDED, "Inference timed out.")
+        finally:
+            with shared_lock:
+                self.inferences.pop(inference_id, None)
+
+        if message["status"] != "COMPLETED":
+            await context.abort(
+                StatusCode.INTERNAL, f"Inference failed: {message['response']}"
+            )
+        return self.create_inference_response(message)
@@ -1,12 +1,29 @@
+import asyncio
+import copy
 import json
 import os
+import queue
 import threading
+import uuid
+from concurrent import futures
 from datetime import datetime
 import shutil
 import numpy as np
 import serving.forecasting_pb2 as forecasting_pb2
 import serving.forecasting_pb2_grpc as forecasting_pb2_grpc
+from serving.result_cache import ResultCache
+from serving.results import (
+    JSONObjectReader,
+    in_time_range,
+    iter_chunks,
+    iter_table_chunks,
+    read_table,
+    slice_time_range,
+    table_to_evaluation,
+    table_to_predictions,
+)
 import yaml
+import config
 from more_utils.logging import configure_logger
 
 from grpc import StatusCode
@@ -17,6 +34,12 @@ EXPERIMENT_TO_CONFIG_FILE = {
     "WIND_POWER_ESTIMATION": "regression_wind_power_estimation.yaml"
 }
 
+WATCH_QUEUE_SIZE = 1000
+
+# columnar result files written by the forecasting service
+PREDICTIONS_FILE = "predictions.arrow"
+EVALUATION_FILE = "evaluation.arrow"
+
 # Define a shared variable to hold the object returned from the background task
 shared_lock = threading.Lock()
 
@@ -30,9 +53,17 @@ class ServerMessageHandler:
 
 
 class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
-    def __init__(self, rabbitmq_context, data_dir, config_dir):
+    def __init__(
+        self, rabbitmq_context, data_dir, config_dir, inference_context=None
+    ):
         self.jobs = {}
+        self.inferences = {}
+        self.watchers = {}
+        # every watcher of the sync server holds a worker thread until the job ends
+        self.watcher_slots = threading.BoundedSemaphore(config.GRPC_MAX_WATCHERS)
+        self.result_cache = ResultCache(config.GRPC_RESULT_CACHE_MB * 1024 * 1024)
         self.rabbitmq_context = rabbitmq_context
+        self.inference_context = inference_context
         self.data_dir = data_dir
         self.config_dir = config_dir
 
@@ -43,34 +74,72 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
                 message = receiver.receive(
                     handler=ServerMessageHandler().handler, max_messages=1, timeout=None
                 )
-                message = message.decode("UTF-8")
-                message = json.loads(message)
-
-                with shared_lock:
-                    job_id = message["job_id"]
-                    if job_id in self.jobs:
-                        target = message["target"]
-                        LOGGER.info(
-                            f"Message Received: {message} for job_id: {job_id} and target: {target}"
+                # a malformed message must not stop the response processor
+                try:
+                    message = message.decode("UTF-8")
+                    message = json.loads(message)
+                    self.handle_response(message)
+                except Exception as e:
+                    LOGGER.error(f"Error processing response: {message}")
+                    LOGGER.exception(e)
+
+    def handle_response(self, message):
+        with shared_lock:
+            job_id = message["job_id"]
+            inference_id = message.get("inference_id")
+            if inference_id is not None:
+                future = self.inferences.get(inference_id)
+                if future is None or not self.resolve_inference(future, message):
+                    LOGGER.warning(
+                        f"Inference response received without a waiting request: {inference_id}"
+                    )
+            elif job_id in self.jobs:
+                target = message["target"]
+                try:
+                    target_data = self.jobs[job_id].get(target)
+                except TypeError:
+                    target_data = None
+                if target_data is None:
+                    LOGGER.error(f"Invalid target received. Message: {message}")
+                    return
+
+                if "PROGRESS" == message["status"]:
+                    LOGGER.debug(
+                        f"Progress received: {message} for job_id: {job_id} and target: {target}"
+                    )
+                    target_data["progress"] = message["response"]
+                    target_data["timestamp"] = message["timestamp"]
+                else:
+                    LOGGER.info(
+                        f"Message Received: {message} for job_id: {job_id} and target: {target}"
+                    )
+                    msg_response = {
+                        "timestamp": message["timestamp"],
+                        "service": message["service"],
+                        "task": message["experiment"],
+                        "response": message["response"],
+                    }
+
+                    target_data.update(msg_response)
+
+                    if "COMPLETED" == message["status"]:
+                        target_data["status"] = "done"
+                        self.result_cache.invalidate(
+                            message["service"], message["experiment"]
                         )
-                        target_data = self.jobs[job_id][target]
-                        msg_response = {
-                            "timestamp": message["timestamp"],
-                            "service": message["service"],
-                            "task": message["experiment"],
-                            "response": message["response"],
-                        }
+                    elif "ERROR" == message["status"]:
+                        target_data["status"] = "error"
 
-                        if target_data["status"] == "inference":
-                            target_data["inference"] = msg_response
-                        else:
-                            target_data.update(msg_response)
+                self.notify_watchers(job_id, target, target_data)
 
-                        if "COMPLETED" == message["status"]:
-                            target_data["status"] = "done"
+            else:
+                LOGGER.error(f"Invalid Job Id received. Message: {message}")
 
-                    else:
-                        LOGGER.error(f"Invalid Job Id received. Message: {message}")
+    def resolve_inference(self, future, message):
+        if not future.set_running_or_notify_cancel():
+            return False
+        future.set_result(message)
+        return True
 
     def get_state(self, job_id):
         return forecasting_pb2.Progress(
@@ -83,35 +152,41 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
         # Read the config from the request
         configs = json.loads(request.config)
 
+        with open(
+            os.path.join(
+                self.config_dir, EXPERIMENT_TO_CONFIG_FILE[configs["experiment"]]
+            )
+        ) as fp:
+            run_configs = yaml.safe_load(fp)
+
+        # append parameters
+        run_configs["job_id"] = request.id
+        run_configs["data_stream"]["time_interval"] = configs["time_interval"]
+        run_configs["data_stream"]["from_date"] = str(
+            datetime.fromtimestamp(configs["startDate"] / 1000)
+        )
+        run_configs["data_stream"]["to_date"] = str(
+            datetime.fromtimestamp(configs["endDate"] / 1000)
+        )
+
         # for each target column, create a status with waiting
         self.jobs[request.id] = {}
         for target in configs["targetColumn"]:
-            self.jobs[request.id] = {target: {"status": "waiting"}}
-
-            with open(
-                os.path.join(
-                    self.config_dir, EXPERIMENT_TO_CONFIG_FILE[configs["experiment"]]
-                )
-            ) as fp:
-                run_configs = yaml.safe_load(fp)
-
-            # append parameters
-            run_configs["job_id"] = request.id
-            run_configs["data_stream"]["target"] = target
-            run_configs["data_stream"]["time_interval"] = configs["time_interval"]
-            run_configs["data_stream"]["from_date"] = str(
-                datetime.fromtimestamp(configs["startDate"] / 1000)
-            )
-            run_configs["data_stream"]["to_date"] = str(
-                datetime.fromtimestamp(configs["endDate"] / 1000)
-            )
-
-            with self.rabbitmq_context.client() as client:
-                publisher = client.get_publisher()
-                publisher.publish(json.dumps(run_configs))
+            target_configs = copy.deepcopy(run_configs)
+            target_configs["data_stream"]["target"] = target
+            self.jobs[request.id][target] = {
+                "status": "waiting",
+                "run_configs": target_configs,
+            }
 
+        # one task for all target columns, so the data is read only once
+        run_configs["data_stream"]["target"] = list(configs["targetColumn"])
+        for target in configs["targetColumn"]:
             self.jobs[request.id][target]["status"] = "processing"
-            self.jobs[request.id][target]["run_configs"] = run_configs
+
+        with self.rabbitmq_context.client() as client:
+            publisher = client.get_publisher()
+            publisher.publish(json.dumps(run_configs))
 
         return forecasting_pb2.Status(id=request.id, status="started")
 
@@ -138,6 +213,86 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
                 # return empty response
                 context.abort(StatusCode.INVALID_ARGUMENT, "Not a valid job id")
 
+    def WatchProgress(self, request, context):
+        """
+        Stream the progress of a specific job
+        Return: The current state of each target column, followed by every status
+        change and batch progress until all target columns are finished
+        """
+        job_id = request.id
+        if not self.watcher_slots.acquire(blocking=False):
+            context.abort(
+                StatusCode.RESOURCE_EXHAUSTED,
+                "Too many progress watchers. Poll GetProgress or use the asyncio server.",
+            )
+
+        updates = queue.Queue(maxsize=WATCH_QUEUE_SIZE)
+        try:
+            current = self.add_watcher(job_id, updates)
+            if current is None:
+                context.abort(StatusCode.INVALID_ARGUMENT, "Not a valid job id")
+
+            yield from current
+            while context.is_active():
+                # the final status is queued before the job counts as finished
+                if self.is_finished(job_id) and updates.empty():
+                    break
+                try:
+                    yield updates.get(timeout=1)
+                except queue.Empty:
+                    pass
+        finally:
+            self.remove_watcher(job_id, updates)
+            self.watcher_slots.release()
+
+    def add_watcher(self, job_id, updates):
+        with shared_lock:
+            if job_id not in self.jobs:
+                return None
+            self.watchers.setdefault(job_id, []).append(updates)
+            return [
+                self.create_progress_update(job_id, target, target_data)
+                for target, target_data in self.jobs[job_id].items()
+            ]
+
+    def remove_watcher(self, job_id, updates):
+        with shared_lock:
+            watchers = self.watchers.get(job_id, [])
+            if updates in watchers:
+                watchers.remove(updates)
+            if not watchers:
+                self.watchers.pop(job_id, None)
+
+    def notify_watchers(self, job_id, target, target_data):
+        for updates in self.watchers.get(job_id, []):
+            try:
+                updates.put_nowait(
+                    self.create_progress_update(job_id, target, target_data)
+                )
+            except (queue.Full, asyncio.QueueFull):
+                # a slow client misses intermediate progress, not the final state
+                LOGGER.debug(f"Progress update dropped for job_id: {job_id}")
+
+    def is_finished(self, job_id):
+        with shared_lock:
+            return all(
+                target_data["status"] in ["done", "error"]
+                for target_data in self.jobs[job_id].values()
+            )
+
+    def create_progress_update(self, job_id, target, target_data):
+        progress = target_data.get("progress", {})
+        return forecasting_pb2.ProgressUpdate(
+            id=job_id,
+            target=target,
+            status=target_data["status"],
+            rows_processed=int(progress.get("rows_processed", 0)),
+            watermark=str(progress.get("watermark") or ""),
+            rows_per_second=float(progress.get("rows_per_second", 0.0)),
+            memory_high_water_mark=int(progress.get("memory_high_water_mark") or 0),
+            timestamp=str(target_data.get("timestamp", "")),
+        )
+
     def GetSpecificTargetResults(self, request, context):
         """
         Get the results for a specific target column
@@ -198,29 +353,136 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
             # return empty response
             context.abort(StatusCode.INVALID_ARGUMENT, "Not a valid job id")
 
+    def StreamTargetResults(self, request, context):
+        """
+        Stream the results for a specific target column
+        Return: Chunks of at most GRPC_RESULTS_CHUNK_SIZE predictions, the first one
+        with the evaluation metrics of the model
+        """
+        target = request.name
+        job_id = request.id
+
+        with shared_lock:
+            target_data = self.jobs.get(job_id, {}).get(target)
+        if target_data is None:
+            context.abort(
+                StatusCode.INVALID_ARGUMENT, "Not a valid job id or target column"
+            )
+        if target_data["status"] != "done":
+            context.abort(StatusCode.INVALID_ARGUMENT, "Task has not finished yet")
+
+        yield from self.iter_results_chunks(
+            target, target_data, request.from_timestamp, request.to_timestamp
+        )
+
+    def StreamAllTargetsResults(self, request, context):
+        """
+        Stream the results for all target columns
+        Return: The chunks of each finished target column, and a single empty chunk
+        for target columns that have not finished yet
+        """
+        job_id = request.id
+
+        with shared_lock:
+            if job_id not in self.jobs:
+                target_items = None
+            else:
+                target_items = list(self.jobs[job_id].items())
+        if target_items is None:
+            context.abort(StatusCode.INVALID_ARGUMENT, "Not a valid job id")
+
+        for target, target_data in target_items:
+            if target_data["status"] == "done":
+                yield from self.iter_results_chunks(target, target_data)
+            else:
+                yield forecasting_pb2.ResultsChunk(target=target, last=True)
+
+    def iter_results_chunks(
+        self, target, target_data, from_timestamp=None, to_timestamp=None
+    ):
+        exp_dir = os.path.join(
+            self.data_dir, target_data["service"], target_data["task"]
+        )
+        if os.path.exists(os.path.join(exp_dir, PREDICTIONS_FILE)):
+            table = slice_time_range(
+                read_table(os.path.join(exp_dir, PREDICTIONS_FILE)),
+                from_timestamp,
+                to_timestamp,
+            )
+            prediction_chunks = iter_table_chunks(table, config.GRPC_RESULTS_CHUNK_SIZE)
+        else:
+            items = JSONObjectReader(
+                os.path.join(exp_dir, "response.json"), "predictions"
+            )
+            if from_timestamp or to_timestamp:
+                items = (
+                    (timestamp, value)
+                    for timestamp, value in items
+                    if in_time_range(timestamp, from_timestamp, to_timestamp)
+                )
+            prediction_chunks = iter_chunks(items, config.GRPC_RESULTS_CHUNK_SIZE)
+
+        chunk = forecasting_pb2.ResultsChunk(
+            target=target,
+            model="SAILModel",
+            evaluation=self.get_evaluation(target_data),
+        )
+        for predictions in prediction_chunks:
+            if chunk.predictions:
+                yield chunk
+                chunk = forecasting_pb2.ResultsChunk(target=target, model="SAILModel")
+            chunk.predictions.update(
+                {timestamp: float(value) for timestamp, value in predictions.items()}
+            )
+
+        chunk.last = True
+        yield chunk
+
     def get_predictions(self, target_data):
         service = target_data["service"]
         task_name = target_data["task"]
 
-        with open(
-            os.path.join(self.data_dir, service, task_name, "response.json")
-        ) as output:
-            response = json.load(output)
-            predictions = {
+        path = os.path.join(self.data_dir, service, task_name, PREDICTIONS_FILE)
+        if os.path.exists(path):
+            return self.result_cache.get(
+                service, task_name, "predictions", path, load_prediction_table
+            )
+
+        return self.result_cache.get(
+            service,
+            task_name,
+            "predictions",
+            os.path.join(self.data_dir, service, task_name, "response.json"),
+            load_predictions,
+        )
+
+    def get_inference_predictions(self, inference_data):
+        # predictions of direct inference are sent within the response message
+        response = inference_data["response"]
+        if isinstance(response, dict) and "predictions" in response:
+            return {
                 timestamp: float(value)
                 for timestamp, value in response["predictions"].items()
             }
-            return predictions
+        return self.get_predictions(inference_data)
 
     def get_evaluation(self, target_data):
         service = target_data["service"]
         task_name = target_data["task"]
 
-        with open(
-            os.path.join(self.data_dir, service, task_name, "evaluation.json")
-        ) as output:
-            response = json.load(output)
-            return response["evaluation"]
+        path = os.path.join(self.data_dir, service, task_name, EVALUATION_FILE)
+        if os.path.exists(path):
+            return self.result_cache.get(
+                service, task_name, "evaluation", path, load_evaluation_table
+            )
+
+        return self.result_cache.get(
+            service,
+            task_name,
+            "evaluation",
+            os.path.join(self.data_dir, service, task_name, "evaluation.json"),
+            load_evaluation,
+        )
 
     def SaveModel(self, request, context):
         # get the information
@@ -258,11 +520,83 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
         )
 
     def GetInference(self, request, context):
+        run_configs = self.create_inference_configs(request)
+        if run_configs is None:
+            # return empty response if model not exist
+            context.abort(
+                StatusCode.INVALID_ARGUMENT,
+                "Model does not exist. Training still in progress or you did not call SaveModel.",
+            )
+        inference_id = run_configs["inference_id"]
+
+        # resolved by the response processor once the worker answers
+        future = futures.Future()
+        with shared_lock:
+            self.inferences[inference_id] = future
+        context.add_callback(future.cancel)
+
+        try:
+            self.publish_inference(run_configs)
+            message = future.result(timeout=self.get_inference_timeout(context))
+        except futures.TimeoutError:
+            context.abort(StatusCode.DEADLINE_EXCEEDED, "Inference timed out.")
+        except futures.CancelledError:
+            context.abort(StatusCode.CANCELLED, "Inference cancelled by the client.")
+        finally:
+            with shared_lock:
+                self.inferences.pop(inference_id, None)
+
+        if message["status"] != "COMPLETED":
+            context.abort(
+                StatusCode.INTERNAL, f"Inference failed: {message['response']}"
+            )
+        return self.create_inference_response(message)
+
+    def create_inference_configs(self, request):
         # get the timestamp from the request and convert it to a datetime object
         date = datetime.fromtimestamp(request.timestamp / 1000)
         model_name = request.model_name
 
-        y_pred = None
+        with shared_lock:
+            target_data = self.find_model(model_name)
+            if target_data is None:
+                return None
+            run_configs = copy.deepcopy(target_data["run_configs"])
+            task = target_data["task"]
+
+        run_configs["mode"] = "inference"
+        run_configs["inference_id"] = uuid.uuid4().hex
+        run_configs["sail"]["model_path"] = os.path.join("/data", task, model_name)
+        run_configs["data_stream"]["from_date"] = str(date)
+        run_configs["data_stream"]["to_date"] = None
+        run_configs["data_stream"]["data_limit"] = run_configs["data_stream"][
+            "data_batch_size"
+        ]
+        return run_configs
+
+    def create_inference_response(self, message):
+        y_pred = self.get_inference_predictions(
+            {
+                "service": message["service"],
+                "task": message["experiment"],
+                "response": message["response"],
+            }
+        )
+        return forecasting_pb2.Inference(predictions=y_pred)
+
+    def publish_inference(self, run_configs):
+        broker_context = self.inference_context or self.rabbitmq_context
+        with broker_context.client() as client:
+            publisher = client.get_publisher()
+            publisher.publish(json.dumps(run_configs))
+
+    def get_inference_timeout(self, context):
+        timeout = config.GRPC_INFERENCE_TIMEOUT
+        if context.time_remaining() is not None:
+            timeout = min(timeout, context.time_remaining())
+        return timeout
+
+    def find_model(self, model_name):
         for target_dict in self.jobs.values():
             for target_data in target_dict.values():
                 if (
@@ -270,36 +604,8 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
                     and "model" in target_data
                     and target_data["model"] == model_name
                 ):
-                    run_configs = target_data["run_configs"]
-                    run_configs["sail"]["model_path"] = os.path.join(
-                        "/data",
-                        target_data["task"],
-                        target_data["model"],
-                    )
-                    run_configs["data_stream"]["from_date"] = str(date)
-                    run_configs["data_stream"]["to_date"] = None
-                    run_configs["data_stream"]["data_limit"] = run_configs[
-                        "data_stream"
-                    ]["data_batch_size"]
-
-                    with self.rabbitmq_context.client() as client:
-                        publisher = client.get_publisher()
-                        publisher.publish(json.dumps(run_configs))
-                        target_data["status"] = "inference"
-
-                        while True:
-                            if target_data["status"] == "done":
-                                y_pred = self.get_predictions(target_data["inference"])
-                                break
-
-        if y_pred is None:
-            # return empty response if model not exist
-            context.abort(
-                StatusCode.INVALID_ARGUMENT,
-                "Model does not exist. Training still in progress or you did not call SaveModel.",
-            )
-        else:
-            return forecasting_pb2.Inference(predictions=y_pred)
+                    return target_data
+        return None
 
     def GetModels(self, request, context):
         models = []
@@ -324,4 +630,27 @@ class RouteGuideServicer(forecasting_pb2_grpc.RouteGuideServicer):
         if model_deleted > 0:
             return forecasting_pb2.Report(report="success")
         else:
-            return forecasting_pb2.Report(report="error")
\ No newline at end of file
+            return forecasting_pb2.Report(report="error")
+
+
+def load_predictions(path):
+    with open(path) as output:
+        response = json.load(output)
+        return {
+            timestamp: float(value)
+            for timestamp, value in response["predictions"].items()
+        }
+
+
+def load_evaluation(path):
+    with open(path) as output:
+        response = json.load(output)
+        return response["evaluation"]
+
+
+def load_prediction_table(path):
+    return table_to_predictions(read_table(path))
+
+
+def load_evaluation_table(path):
+    return table_to_evaluation(read_table(path))
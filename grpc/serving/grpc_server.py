@@ -1,3 +1,4 @@
+import asyncio
 import threading
 from concurrent import futures
 
@@ -13,6 +14,7 @@ from argparse import ArgumentParser
 import serving.forecasting_pb2_grpc as forecasting_pb2_grpc
 from more_utils.logging import configure_logger
 from more_utils.messaging import RabbitMQFactory
+from serving.grpc_aio_route import AsyncRouteGuideServicer
 from serving.grpc_route import RouteGuideServicer
 from validation import validate_host_and_port
 
@@ -31,23 +33,47 @@ BROKER_CONFIG = {
 LOGGER = configure_logger(logger_name="GRPC_Server", package_name=None)
 
 
+def create_broker_contexts():
+    validate_host_and_port(config.RABBITMQ_HOST, config.RABBITMQ_PORT)
+    rabbitmq_context = RabbitMQFactory.create_context(args=BROKER_CONFIG)
+    LOGGER.info(
+        f"Connected to Message Broker at {config.RABBITMQ_HOST}:{config.RABBITMQ_PORT}"
+    )
+
+    # direct inference requests skip the training queue of the workers
+    inference_context = None
+    if config.GRPC_INFERENCE_QUEUE:
+        inference_context = RabbitMQFactory.create_context(
+            args={
+                **BROKER_CONFIG,
+                "broker_response_queue": config.GRPC_INFERENCE_QUEUE,
+            }
+        )
+    return rabbitmq_context, inference_context
+
+
+def log_config(config):
+    LOGGER.info("Broker configs:\n" + json.dumps(config, indent=2))
+
+
 class GRPCServer:
     def __init__(self, hostname, port, data_dir, config_dir) -> None:
         signal.signal(signal.SIGINT, self.stop)
         signal.signal(signal.SIGTERM, self.stop)
 
-        self.log_config(BROKER_CONFIG)
+        log_config(BROKER_CONFIG)
+        rabbitmq_context, inference_context = create_broker_contexts()
 
-        validate_host_and_port(config.RABBITMQ_HOST, config.RABBITMQ_PORT)
-        rabbitmq_context = RabbitMQFactory.create_context(args=BROKER_CONFIG)
-        LOGGER.info(
-            f"Connected to Message Broker at {config.RABBITMQ_HOST}:{config.RABBITMQ_PORT}"
+        # progress watchers get their own threads, so they can not starve other RPCs
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=5 + config.GRPC_MAX_WATCHERS
         )
-
-        self.executor = futures.ThreadPoolExecutor(max_workers=5)
         self.server = grpc.server(self.executor)
         self.servicer = RouteGuideServicer(
-            rabbitmq_context=rabbitmq_context, data_dir=data_dir, config_dir=config_dir
+            rabbitmq_context=rabbitmq_context,
+            data_dir=data_dir,
+            config_dir=config_dir,
+            inference_context=inference_context,
         )
         forecasting_pb2_grpc.add_RouteGuideServicer_to_server(
             self.servicer, self.server
@@ -70,8 +96,61 @@ class GRPCServer:
         self.server.stop(0)
         self.server.wait_for_termination()
 
-    def log_config(self, config):
-        LOGGER.info("Broker configs:\n" + json.dumps(config, indent=2))
+
+class AsyncGRPCServer:
+    """
+    grpc.aio variant of the server, where the number of concurrent RPCs is not
+    bounded by a thread pool.
+    """
+
+    def __init__(self, hostname, port, data_dir, config_dir) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.data_dir = data_dir
+        self.config_dir = config_dir
+        self.server = None
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        log_config(BROKER_CONFIG)
+        rabbitmq_context, inference_context = create_broker_contexts()
+
+        loop = asyncio.get_running_loop()
+        self.server = grpc.aio.server()
+        self.servicer = AsyncRouteGuideServicer(
+            rabbitmq_context=rabbitmq_context,
+            data_dir=self.data_dir,
+            config_dir=self.config_dir,
+            inference_context=inference_context,
+        )
+        self.servicer.loop = loop
+        forecasting_pb2_grpc.add_RouteGuideServicer_to_server(
+            self.servicer, self.server
+        )
+        self.server.add_insecure_port(f"{self.hostname}:{self.port}")
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: asyncio.ensure_future(self.stop()))
+
+        # Start response processor, it hands the messages over to the event loop
+        self.thread = threading.Thread(
+            target=self.servicer.process_reponse, daemon=True
+        )
+        self.thread.start()
+
+        LOGGER.info(
+            f"Asyncio GRPC Server Started. Listening on {self.hostname}:{self.port}"
+        )
+
+        await self.server.start()
+        await self.server.wait_for_termination()
+
+    async def stop(self):
+        LOGGER.info("Shutting down GRPC server...")
+        await self.server.stop(0)
+        self.servicer.executor.shutdown()
 
 
 if __name__ == "__main__":
@@ -88,6 +167,11 @@ if __name__ == "__main__":
         type=str,
         required=True,
     )
+    parser.add_argument(
+        "--asyncio",
+        help="Serve the RPCs with the asyncio GRPC server",
+        action="store_true",
+    )
 
     args = parser.parse_args()
     data_dir = args.data_dir
@@ -95,4 +179,7 @@ if __name__ == "__main__":
     os.makedirs(data_dir, exist_ok=True)
 
     LOGGER.info(f"Starting IBM Forecasting GRPC server")
-    GRPCServer(config.GRPC_HOST, config.GRPC_PORT, data_dir, config_dir)
+    if args.asyncio:
+        AsyncGRPCServer(config.GRPC_HOST, config.GRPC_PORT, data_dir, config_dir).run()
+    else:
+        GRPCServer(config.GRPC_HOST, config.GRPC_PORT, data_dir, config_dir)
@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="GRPC_Server", package_name=None)
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of parsed result files (predictions and evaluations).
+
+    Entries are keyed by service, task and kind of result and validated against
+    the mtime and size of the file they were parsed from, so a rewritten file
+    is parsed again. The cache is bounded by the estimated bytes of the parsed
+    values. Cached values are shared between calls and must not be modified.
+    """
+
+    def __init__(self, max_bytes) -> None:
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, service, task, kind, path, load):
+        key = (service, task, kind)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        value = load(path)
+        self.put(key, version, value)
+        return value
+
+    def put(self, key, version, value):
+        nbytes = estimate_bytes(value)
+        with self.lock:
+            self.remove(key)
+            if nbytes > self.max_bytes:
+                return
+
+            self.entries[key] = (version, value, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                old_key, (_, _, old_nbytes) = self.entries.popitem(last=False)
+                self.total_bytes -= old_nbytes
+                LOGGER.debug(f"Evicted cached results: {old_key}")
+
+    def invalidate(self, service, task):
+        with self.lock:
+            for key in [key for key in self.entries if key[:2] == (service, task)]:
+                self.remove(key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+
+def estimate_bytes(value):
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_bytes(key) + estimate_bytes(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
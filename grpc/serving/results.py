@@ -0,0 +1,150 @@
+import json
+from json import JSONDecodeError
+
+import numpy as np
+import pyarrow
+
+BLOCK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:}]"
+
+decoder = json.JSONDecoder()
+
+
+class JSONObjectReader:
+    """
+    Reads the items of one top-level object of a JSON file, e.g. the
+    predictions of a response.json, without loading the whole file.
+
+    The file is read in blocks of `block_size` characters and every key and
+    value is decoded with `JSONDecoder.raw_decode` as soon as it is complete,
+    so memory stays bounded by the block size and the largest single value.
+    """
+
+    def __init__(self, path, key, block_size=BLOCK_SIZE) -> None:
+        self.path = path
+        self.key = key
+        self.block_size = block_size
+        self.file = None
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def __iter__(self):
+        with open(self.path) as self.file:
+            self.expect("{")
+            while True:
+                if self.peek() == "}":
+                    raise KeyError(self.key)
+                key = self.decode()
+                self.expect(":")
+                if key == self.key:
+                    break
+                self.decode()
+                if self.peek() == ",":
+                    self.expect(",")
+
+            self.expect("{")
+            while self.peek() != "}":
+                key = self.decode()
+                self.expect(":")
+                yield key, self.decode()
+                if self.peek() == ",":
+                    self.expect(",")
+
+    def read(self):
+        block = self.file.read(self.block_size)
+        if not block:
+            self.eof = True
+        self.buffer = self.buffer[self.pos :] + block
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                raise JSONDecodeError("Unexpected end of file", self.buffer, self.pos)
+            self.read()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+                # a number cut off at the end of the buffer continues in the next block
+                if self.eof or (
+                    end < len(self.buffer) and self.buffer[end] in DELIMITERS
+                ):
+                    self.pos = end
+                    return value
+            except JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read()
+
+
+def iter_chunks(items, chunk_size):
+    chunk = {}
+    for key, value in items:
+        chunk[key] = value
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = {}
+    if chunk:
+        yield chunk
+
+
+def read_table(path):
+    # memory-mapped, so the columns are served from the page cache without copies
+    with pyarrow.memory_map(path) as source:
+        return pyarrow.ipc.open_file(source).read_all()
+
+
+def slice_time_range(table, from_timestamp=None, to_timestamp=None):
+    """
+    Returns the rows of a table sorted by its timestamp column within
+    [from_timestamp, to_timestamp] using binary search, without copying.
+    """
+    timestamps = table.column("timestamp").to_numpy()
+    start = np.searchsorted(timestamps, from_timestamp, "left") if from_timestamp else 0
+    end = (
+        np.searchsorted(timestamps, to_timestamp, "right")
+        if to_timestamp
+        else len(timestamps)
+    )
+    return table.slice(start, max(0, end - start))
+
+
+def iter_table_chunks(table, chunk_size):
+    for offset in range(0, table.num_rows, chunk_size):
+        yield table_to_predictions(table.slice(offset, chunk_size))
+
+
+def table_to_predictions(table):
+    return dict(
+        zip(
+            map(str, table.column("timestamp").to_pylist()),
+            table.column("prediction").to_pylist(),
+        )
+    )
+
+
+def table_to_evaluation(table):
+    return dict(
+        zip(table.column("metric").to_pylist(), table.column("value").to_pylist())
+    )
+
+
+def in_time_range(timestamp, from_timestamp=None, to_timestamp=None):
+    timestamp = int(timestamp)
+    return (not from_timestamp or timestamp >= from_timestamp) and (
+        not to_timestamp or timestamp <= to_timestamp
+    )
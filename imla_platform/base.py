@@ -1,19 +1,28 @@
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import ray
 from more_utils.logging import configure_logger
-from more_utils.time_series import TimeseriesFactory
 from ray.tune.utils.util import SafeFallbackEncoder
 from sail.telemetry import DummySpan, TracingClient
 
-from imla_platform.data_stream import DataStreamFactory
+from imla_platform.data_stream import DataStreamFactory, get_targets
+from imla_platform.predictions import (
+    EVALUATION_FILE,
+    PredictionWriter,
+    create_evaluation_table,
+    write_table,
+)
 from imla_platform.validation import validate_address
 
 LOGGER = configure_logger(logger_name="IMLA Platform", package_name=None)
 
+INFERENCE_MODE = "inference"
+
 SERVICE_NAME = (
     os.environ.get("POD_NAME") if os.environ.get("POD_NAME") else "IMLAPlatform"
 )
@@ -30,24 +39,72 @@ class MessageHandler:
         return self.message
 
 
+class Job:
+    """
+    State of one time-series task running in a job slot of the worker.
+    """
+
+    def __init__(self, run_configs, exp_dir, exp_name, target=None) -> None:
+        self.run_configs = run_configs
+        self.job_id = run_configs["job_id"]
+        self.target = (
+            target if target is not None else run_configs["data_stream"]["target"]
+        )
+        self.inference_id = run_configs.get("inference_id")
+        self.exp_dir = exp_dir
+        self.exp_name = exp_name
+        self.tracer = None
+        self.model = None
+        self.predictions = {}
+        self.prediction_writer = None
+        self.error = None
+
+
 class BaseService:
-    def __init__(self, name, modelardb_conn, message_broker, data_dir):
+    def __init__(
+        self,
+        name,
+        modelardb_conn,
+        message_broker,
+        data_dir,
+        job_slots=1,
+        ray_runtime=None,
+        inference_broker=None,
+        progress_interval=1.0,
+        prediction_buffer_rows=10000,
+        prediction_fsync_interval=5.0,
+    ):
         self.name = name
         self.modelardb_conn = modelardb_conn
         self.message_broker = message_broker
         self.data_dir = data_dir
-
-        self.ts_factory = TimeseriesFactory(source_db_conn=modelardb_conn)
+        self.job_slots = job_slots
+        self.free_slots = threading.Semaphore(job_slots)
+        self.active_jobs = 0
+        self.jobs_lock = threading.Lock()
+        self.ray_runtime = ray_runtime
+        self.inference_broker = inference_broker
+        self.progress_interval = progress_interval
+        self.prediction_buffer_rows = prediction_buffer_rows
+        self.prediction_fsync_interval = prediction_fsync_interval
 
     def create_client(self):
         return self.message_broker.client()
 
     def create_experiment_directory(self, data_dir):
         exp_name = "IMLATask" + "_" + time.strftime("%d-%m-%Y_%H:%M:%S")
-        exp_dir = os.path.join(data_dir, exp_name)
         os.umask(0)
-        os.makedirs(exp_dir, mode=0o777, exist_ok=True)
-        return exp_dir, exp_name
+
+        # jobs started within the same second get a numbered directory
+        for i in range(1000):
+            name = exp_name if i == 0 else f"{exp_name}_{i}"
+            exp_dir = os.path.join(data_dir, name)
+            try:
+                os.makedirs(exp_dir, mode=0o777)
+                return exp_dir, name
+            except FileExistsError:
+                continue
+        raise Exception(f"Unable to create experiment directory: {exp_dir}")
 
     def log_config(self, config):
         LOGGER.info(
@@ -55,30 +112,63 @@ class BaseService:
             + json.dumps(config, indent=2, cls=SafeFallbackEncoder)
         )
 
-    def send_job_response(self, job_id, status, target, response):
+    def send_job_response(self, job, status, response):
         message = {
-            "job_id": job_id,
+            "job_id": job.job_id,
             "status": status,
             "timestamp": datetime.now(),
             "service": SERVICE_NAME,
-            "experiment": self.exp_name,
-            "target": target,
+            "experiment": job.exp_name,
+            "target": job.target,
             "response": response,
         }
-        self.create_client().get_publisher().publish(json.dumps(message, default=str))
+        if job.inference_id is not None:
+            message["inference_id"] = job.inference_id
+        # sent about once a second per target while a job reports progress
+        with self.create_client() as client:
+            client.get_publisher().publish(json.dumps(message, default=str))
+
+    def create_prediction_writer(self, job):
+        return PredictionWriter(
+            job.exp_dir, self.prediction_buffer_rows, self.prediction_fsync_interval
+        )
 
-    def publish_predictions(self, predictions):
-        response_msg = {"predictions": predictions}
-        with open(os.path.join(self.exp_dir, "response.json"), "w") as f:
-            json.dump(response_msg, f, indent=2)
+    def record_predictions(self, job, predictions, actuals):
+        if job.prediction_writer is not None:
+            try:
+                job.prediction_writer.write(predictions, actuals)
+                return
+            except ValueError:
+                if job.prediction_writer.num_rows_ > 0:
+                    raise
+                LOGGER.warning(
+                    "Predictions are not numeric or not keyed by timestamps. Writing JSON."
+                )
+                job.prediction_writer = None
+        job.predictions.update(predictions)
+
+    def publish_predictions(self, job):
+        if job.prediction_writer is not None:
+            job.prediction_writer.close()
+            return
 
-    def publish_evaluation(self, evaluation):
-        response_msg = {"evaluation": evaluation}
-        with open(os.path.join(self.exp_dir, "evaluation.json"), "w") as f:
+        response_msg = {"predictions": job.predictions}
+        with open(os.path.join(job.exp_dir, "response.json"), "w") as f:
             json.dump(response_msg, f, indent=2)
 
-    def save_model_instance(self, model):
-        model.save_model(os.path.join(self.exp_dir, "model"))
+    def publish_evaluation(self, job, evaluation):
+        try:
+            table = create_evaluation_table(evaluation)
+        except (AttributeError, TypeError, ValueError):
+            LOGGER.warning("Evaluation metrics are not numeric. Writing JSON.")
+            response_msg = {"evaluation": evaluation}
+            with open(os.path.join(job.exp_dir, "evaluation.json"), "w") as f:
+                json.dump(response_msg, f, indent=2)
+            return
+        write_table(os.path.join(job.exp_dir, EVALUATION_FILE), table)
+
+    def save_model_instance(self, job, model):
+        model.save_model(os.path.join(job.exp_dir, "model"))
 
     def process_ts_batch(self, ts_batch, timestamp_col):
         LOGGER.debug(f"Processing new data batch... ")
@@ -101,124 +191,328 @@ class BaseService:
         else:
             return DummySpan()
 
+    def create_tracer(self, tracer_configs):
+        if tracer_configs:
+            otlp_endpoint = tracer_configs["otlp_endpoint"]
+            if validate_address(otlp_endpoint, throw_exception=False):
+                LOGGER.info(
+                    f"Telemetry service is enabled. Check traces at: {tracer_configs['web_interface']}/search&service={SERVICE_NAME}"
+                )
+                return TracingClient(
+                    service_name=SERVICE_NAME,
+                    otlp_endpoint=otlp_endpoint,
+                )
+            else:
+                LOGGER.error(f"Telemetry service at {otlp_endpoint} is unreachable.")
+        else:
+            LOGGER.info(f"Telemetry service is disabled.")
+        return None
+
     def process_time_series(self):
+        # only take a task from the Message Broker once a job slot is free
+        self.free_slots.acquire()
         LOGGER.info("Listening for incoming time-series task...")
         try:
             mh = MessageHandler()
 
             # Receive one task at a time from Message Broker
-            self.create_client().get_consumer().receive(
-                mh.handler, max_messages=1, timeout=None
-            )
+            with self.create_client() as client:
+                client.get_consumer().receive(mh.handler, max_messages=1, timeout=None)
+            run_configs = mh.get_message()
+        except Exception as e:
+            self.free_slots.release()
+            LOGGER.error(f"Error receiving new request:")
+            LOGGER.exception(e)
+            return
+
+        if run_configs.get("mode") == INFERENCE_MODE:
+            self.free_slots.release()
+            self.process_inference(run_configs)
+            return
+
+        with self.jobs_lock:
+            self.active_jobs += 1
+            if self.ray_runtime is not None:
+                self.ray_runtime.ensure_started()
+
+        if self.job_slots > 1:
+            threading.Thread(
+                target=self.process_job, args=(run_configs,), daemon=True
+            ).start()
+        else:
+            self.process_job(run_configs)
 
-            # get message from handler
+    def process_inference_requests(self):
+        try:
+            mh = MessageHandler()
+            with self.inference_broker.client() as client:
+                client.get_consumer().receive(mh.handler, max_messages=1, timeout=None)
             run_configs = mh.get_message()
-            self.log_config(run_configs["data_stream"])
+        except Exception as e:
+            LOGGER.error(f"Error receiving new inference request:")
+            LOGGER.exception(e)
+            return
+
+        self.process_inference(run_configs)
 
-            self.exp_dir, self.exp_name = self.create_experiment_directory(
-                self.data_dir
+    def process_inference(self, run_configs):
+        """
+        Runs a saved model over the requested data window without training it.
+        No experiment directory is created and the predictions are returned in
+        the response message.
+        """
+        job = Job(run_configs, exp_dir=None, exp_name=None)
+        try:
+            start = time.perf_counter()
+            if not run_configs["sail"]["model_path"]:
+                raise Exception("Inference requires the model_path of a saved model.")
+            model = self.load_or_create_model(run_configs["sail"], job)
+
+            data_stream = DataStreamFactory.create_data_stream(
+                run_configs["data_stream"], self.modelardb_conn, data_dir=self.data_dir
             )
-            LOGGER.info(f"Experiment directory created: {self.exp_dir}")
+            data_session = data_stream.get_batches()
+            timestamp_col = run_configs["data_stream"]["timestamp_col"]
+
+            predictions = {}
+            try:
+                for ts_batch in data_session:
+                    predict_start = time.perf_counter()
+                    predictions.update(
+                        self.predict_ts_batch(
+                            model, ts_batch, job.target, timestamp_col
+                        )
+                    )
+                    # releases the memory budget and feeds the batch size controller
+                    data_stream.record_batch(
+                        ts_batch, time.perf_counter() - predict_start, 0.0
+                    )
+            finally:
+                data_session.close()
 
-            # Send acknowlegment for the incoming task
             self.send_job_response(
-                job_id=run_configs["job_id"],
-                status="ACCEPTED",
-                target=run_configs["data_stream"]["target"],
-                response="Task Accepted by Forecasting Service.",
+                job, status="COMPLETED", response={"predictions": predictions}
+            )
+            LOGGER.info(
+                f"Inference for job {job.job_id} finished in {time.perf_counter() - start:.3f} seconds."
             )
+        except Exception as e:
+            self.send_job_response(job, status="ERROR", response=str(e))
+            LOGGER.error(f"Error processing inference request:")
+            LOGGER.exception(e)
 
-            tracer = None
-            tracer_configs = run_configs["sail"]["tracer"]
-            if tracer_configs:
-                otlp_endpoint = tracer_configs["otlp_endpoint"]
-                if validate_address(otlp_endpoint, throw_exception=False):
-                    tracer = TracingClient(
-                        service_name=SERVICE_NAME,
-                        otlp_endpoint=otlp_endpoint,
-                    )
-                    LOGGER.info(
-                        f"Telemetry service is enabled. Check traces at: {tracer_configs['web_interface']}/search&service={SERVICE_NAME}"
-                    )
-                else:
-                    LOGGER.error(
-                        f"Telemetry service at {otlp_endpoint} is unreachable."
-                    )
-            else:
-                LOGGER.info(f"Telemetry service is disabled.")
+    def process_job(self, run_configs):
+        jobs = []
+        try:
+            self.log_config(run_configs["data_stream"])
+
+            # a multi-target task reads the data once and trains one model per target
+            for target in get_targets(run_configs["data_stream"]):
+                exp_dir, exp_name = self.create_experiment_directory(self.data_dir)
+                job = Job(run_configs, exp_dir, exp_name, target)
+                job.prediction_writer = self.create_prediction_writer(job)
+                jobs.append(job)
+                LOGGER.info(
+                    f"Experiment directory created for target {target}: {job.exp_dir}"
+                )
+
+                # Send acknowlegment for the incoming task
+                self.send_job_response(
+                    job,
+                    status="ACCEPTED",
+                    response="Task Accepted by Forecasting Service.",
+                )
 
-            with self.trace(tracer, self.exp_name, current_span=True):
+            tracer = self.create_tracer(run_configs["sail"]["tracer"])
+            for job in jobs:
+                job.tracer = tracer
+
+            with self.trace(tracer, jobs[0].exp_name, current_span=True):
                 with self.trace(tracer, "PIPELINE_LOAD"):
-                    model = self.load_or_create_model(run_configs["sail"], tracer)
+                    for job in jobs:
+                        job.model = self.load_or_create_model(run_configs["sail"], job)
 
                 data_stream = DataStreamFactory.create_data_stream(
-                    run_configs["data_stream"], self.ts_factory
+                    run_configs["data_stream"],
+                    self.modelardb_conn,
+                    data_dir=self.data_dir,
+                    exp_dir=jobs[0].exp_dir,
                 )
-                data_session = data_stream.get_data_session()
-                target, timestamp_col, fit_params = data_stream.get_training_params(
+                data_session = data_stream.get_batches()
+                _, timestamp_col, fit_params = data_stream.get_training_params(
                     run_configs["sail"]["steps"][-1]["name"]
                 )
 
                 with self.trace(tracer, "PIPELINE_TRAIN", current_span=True):
-                    predictions = {}
-                    for ts_batch in data_session:
-                        if data_stream.validate_batch(ts_batch):
-                            ts_batch = data_stream.apply_granularity(ts_batch)
-                            prediction = self.process_ts_batch(
-                                model,
+                    executor = (
+                        ThreadPoolExecutor(max_workers=len(jobs))
+                        if len(jobs) > 1
+                        else None
+                    )
+                    last_progress = time.perf_counter()
+                    try:
+                        for ts_batch in data_session:
+                            running_jobs = [job for job in jobs if job.error is None]
+                            if not running_jobs:
+                                break
+
+                            timings = self.process_jobs_batch(
+                                running_jobs,
                                 ts_batch,
-                                target,
                                 timestamp_col,
                                 fit_params,
+                                executor,
+                            )
+                            data_stream.record_batch(
+                                ts_batch,
+                                timings.get("predict", 0.0),
+                                timings.get("train", 0.0),
                             )
-                            predictions.update(prediction)
-                        data_stream.wait()
-
-                # save trained model instance
-                if run_configs["save_model_after_training"]:
-                    with self.trace(tracer, "PIPELINE_PERSIST-model"):
-                        self.save_model_instance(model)
-
-                # publish predictions
-                with self.trace(tracer, "PIPELINE_PUBLISH-predictions"):
-                    self.publish_predictions(predictions)
-
-                # publish evaluation
-                with self.trace(tracer, "PIPELINE_PUBLISH-evaluations"):
-                    self.publish_evaluation(model.metrics)
-
-                self.send_job_response(
-                    job_id=run_configs["job_id"],
-                    status="COMPLETED",
-                    target=run_configs["data_stream"]["target"],
-                    response="Task finished successfully.",
-                )
 
-                LOGGER.info(
-                    f"Task finished successfully."
-                    + (
-                        f" Model saved to {self.exp_dir}/model \n"
-                        if run_configs["save_model_after_training"]
-                        else ""
+                            if (
+                                self.progress_interval is not None
+                                and time.perf_counter() - last_progress
+                                >= self.progress_interval
+                            ):
+                                last_progress = time.perf_counter()
+                                progress = data_stream.get_progress()
+                                for job in running_jobs:
+                                    if job.error is None:
+                                        self.send_job_response(
+                                            job, status="PROGRESS", response=progress
+                                        )
+                            data_stream.wait()
+                    finally:
+                        data_session.close()
+                        if executor is not None:
+                            executor.shutdown()
+
+                memory_high_water_mark = data_stream.get_memory_high_water_mark()
+                if memory_high_water_mark is not None:
+                    LOGGER.info(
+                        f"Memory high-water mark of data batches: {memory_high_water_mark / 1024 ** 2:.2f} MB"
                     )
-                )
+
+                for job in jobs:
+                    if job.error is None:
+                        self.finish_job(job, run_configs, tracer)
 
         except Exception as e:
             if run_configs:
-                self.send_job_response(
-                    job_id=run_configs["job_id"],
-                    status="ERROR",
-                    target=run_configs["data_stream"]["target"],
-                    response=str(e),
-                )
+                # one response per target, as the server tracks every target
+                jobs = jobs or [
+                    Job(run_configs, exp_dir=None, exp_name=None, target=target)
+                    for target in get_targets(run_configs["data_stream"])
+                ]
+                for job in jobs:
+                    if job.error is None:
+                        self.send_job_response(job, status="ERROR", response=str(e))
             LOGGER.error(f"Error processing new request:")
             LOGGER.exception(e)
         finally:
-            ray.shutdown()
+            # keep what was predicted so far on disk
+            for job in jobs:
+                if job.prediction_writer is not None:
+                    try:
+                        job.prediction_writer.abort()
+                    except Exception as e:
+                        LOGGER.exception(e)
+            with self.jobs_lock:
+                self.active_jobs -= 1
+                # Ray is shared by all running jobs of the worker
+                if self.active_jobs == 0:
+                    if self.ray_runtime is not None:
+                        self.ray_runtime.cleanup()
+                    else:
+                        ray.shutdown()
+            self.free_slots.release()
+
+    def process_jobs_batch(self, jobs, ts_batch, timestamp_col, fit_params, executor):
+        """
+        Feeds the same read-only batch to the model of every job and returns the
+        longest predict and train times, as the jobs run in parallel.
+        """
+        if executor is None:
+            timings = [
+                self.process_job_batch(job, ts_batch, timestamp_col, fit_params)
+                for job in jobs
+            ]
+        else:
+            timings = list(
+                executor.map(
+                    lambda job: self.process_job_batch(
+                        job, ts_batch, timestamp_col, fit_params
+                    ),
+                    jobs,
+                )
+            )
+        return {
+            step: max(timing.get(step, 0.0) for timing in timings)
+            for step in ["predict", "train"]
+        }
+
+    def process_job_batch(self, job, ts_batch, timestamp_col, fit_params):
+        timings = {}
+        actuals = {}
+        try:
+            prediction = self.process_ts_batch(
+                job.model,
+                ts_batch,
+                job.target,
+                timestamp_col,
+                fit_params,
+                timings,
+                actuals=actuals,
+            )
+            self.record_predictions(job, prediction, actuals)
+        except Exception as e:
+            # a failing target does not stop the other targets of the task
+            job.error = e
+            self.send_job_response(job, status="ERROR", response=str(e))
+            LOGGER.error(f"Error processing target {job.target}:")
+            LOGGER.exception(e)
+        return timings
+
+    def finish_job(self, job, run_configs, tracer):
+        # save trained model instance
+        if run_configs["save_model_after_training"]:
+            with self.trace(tracer, "PIPELINE_PERSIST-model"):
+                self.save_model_instance(job, job.model)
+
+        # publish predictions
+        with self.trace(tracer, "PIPELINE_PUBLISH-predictions"):
+            self.publish_predictions(job)
+
+        # publish evaluation
+        with self.trace(tracer, "PIPELINE_PUBLISH-evaluations"):
+            self.publish_evaluation(job, job.model.metrics)
+
+        self.send_job_response(
+            job,
+            status="COMPLETED",
+            response="Task finished successfully.",
+        )
+
+        LOGGER.info(
+            f"Task {job.exp_name} for target {job.target} finished successfully."
+            + (
+                f" Model saved to {job.exp_dir}/model \n"
+                if run_configs["save_model_after_training"]
+                else ""
+            )
+        )
 
     def run_forever(self, method, **kwargs):
         while True:
             method(**kwargs)
 
     def run(self):
+        if self.ray_runtime is not None:
+            self.ray_runtime.start()
+        if self.inference_broker is not None:
+            threading.Thread(
+                target=self.run_forever,
+                args=(self.process_inference_requests,),
+                daemon=True,
+            ).start()
         LOGGER.info(f"Service started: {self.name}")
@@ -0,0 +1,209 @@
+import csv
+import os
+import threading
+from statistics import median
+
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="DataStream", package_name=None)
+
+# the batch size may grow up to this multiple of data_batch_size by default
+DEFAULT_MAX_SIZE_FACTOR = 10
+
+BATCH_LOG_FIELDS = [
+    "batch",
+    "batch_size",
+    "rows",
+    "bytes",
+    "fetch_time",
+    "predict_time",
+    "train_time",
+    "rows_per_second",
+]
+
+
+class AdaptiveBatchSizeController:
+    """
+    Tunes the number of rows requested per data batch while a job is running.
+
+    Throughput (rows per second of fetch, predict and train time) is measured
+    over a window of batches for the current batch size, and the batch size is
+    then multiplied or divided by `growth_factor`, keeping the direction while
+    throughput improves and reversing it otherwise. The batch size always
+    stays within [min_size, max_size] and below the number of rows that fit
+    into `max_memory_bytes`.
+    """
+
+    def __init__(
+        self,
+        initial_size,
+        min_size,
+        max_size,
+        max_memory_bytes=None,
+        growth_factor=1.5,
+        window=3,
+        log_path=None,
+    ) -> None:
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_memory_bytes = max_memory_bytes
+        self.growth_factor = growth_factor
+        self.window = window
+        self.log_path = log_path
+
+        self.batch_size = self.clip(initial_size)
+        self.direction = 1
+        self.bytes_per_row = None
+        self.last_throughput = None
+        self.throughputs = []
+        self.n_batches = 0
+
+        if self.log_path:
+            with open(self.log_path, "w", newline="") as f:
+                csv.writer(f).writerow(BATCH_LOG_FIELDS)
+
+    def clip(self, batch_size):
+        max_size = self.max_size
+        if self.max_memory_bytes and self.bytes_per_row:
+            max_size = min(max_size, int(self.max_memory_bytes / self.bytes_per_row))
+        return int(max(self.min_size, min(batch_size, max_size)))
+
+    def record(
+        self,
+        rows,
+        nbytes,
+        predict_time,
+        train_time,
+        fetch_time=0.0,
+        raw_rows=None,
+        raw_nbytes=None,
+    ):
+        """
+        Records a processed batch. `raw_rows` and `raw_nbytes` are the size of
+        the fetched rows it was resampled from, which the batch size applies to.
+        """
+        if raw_rows:
+            rows, nbytes = raw_rows, raw_nbytes or nbytes
+        elapsed = fetch_time + predict_time + train_time
+        throughput = rows / elapsed if elapsed > 0 else 0.0
+        self.n_batches += 1
+
+        if self.log_path:
+            with open(self.log_path, "a", newline="") as f:
+                csv.writer(f).writerow(
+                    [
+                        self.n_batches,
+                        self.batch_size,
+                        rows,
+                        nbytes,
+                        round(fetch_time, 6),
+                        round(predict_time, 6),
+                        round(train_time, 6),
+                        round(throughput, 3),
+                    ]
+                )
+
+        if rows > 0:
+            self.bytes_per_row = nbytes / rows
+        self.throughputs.append(throughput)
+        if len(self.throughputs) >= self.window:
+            self.adjust(median(self.throughputs))
+            self.throughputs = []
+
+    def adjust(self, throughput):
+        if self.last_throughput is not None and throughput < self.last_throughput:
+            self.direction = -self.direction
+        self.last_throughput = throughput
+
+        if self.direction > 0:
+            batch_size = max(self.batch_size * self.growth_factor, self.batch_size + 1)
+        else:
+            batch_size = min(self.batch_size / self.growth_factor, self.batch_size - 1)
+        batch_size = self.clip(batch_size)
+
+        if batch_size != self.batch_size:
+            LOGGER.debug(
+                f"Batch size changed from {self.batch_size} to {batch_size} at {throughput:.1f} rows/s."
+            )
+        self.batch_size = batch_size
+
+
+class MemoryBudget:
+    """
+    Bounds the bytes of data batches that are held in memory at the same time,
+    i.e. batches that were fetched but not processed yet.
+
+    `acquire` blocks while the batches in flight would exceed `max_bytes`, which
+    holds back the fetching of further batches. A single batch is always let
+    through so an oversized batch can not block the stream.
+    """
+
+    def __init__(self, max_bytes) -> None:
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self.high_water_mark = 0
+        self.bytes_per_row = None
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, nbytes, rows):
+        with self.condition:
+            while (
+                not self.closed
+                and self.in_flight > 0
+                and self.in_flight + nbytes > self.max_bytes
+            ):
+                self.condition.wait(timeout=0.1)
+
+            self.in_flight += nbytes
+            if rows > 0:
+                self.bytes_per_row = nbytes / rows
+            if self.in_flight > self.high_water_mark:
+                self.high_water_mark = self.in_flight
+                LOGGER.debug(
+                    f"Memory high-water mark of data batches: {self.high_water_mark / 1024 ** 2:.2f} MB"
+                )
+
+    def release(self, nbytes):
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - nbytes)
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def max_rows(self, n_batches):
+        if not self.bytes_per_row:
+            return None
+        return max(1, int(self.max_bytes / (n_batches * self.bytes_per_row)))
+
+
+def create_memory_budget(data_configs):
+    memory_budget_mb = data_configs.get("memory_budget_mb")
+    if not memory_budget_mb:
+        return None
+    return MemoryBudget(memory_budget_mb * 1024 * 1024)
+
+
+def create_batch_size_controller(data_configs, log_dir=None):
+    adaptive_configs = data_configs.get("adaptive_batch_size")
+    if not adaptive_configs:
+        return None
+    elif not isinstance(adaptive_configs, dict):
+        adaptive_configs = {}
+
+    initial_size = data_configs["data_batch_size"]
+    max_memory_mb = adaptive_configs.get("max_memory_mb")
+    return AdaptiveBatchSizeController(
+        initial_size,
+        min_size=adaptive_configs.get("min_size", 1),
+        max_size=adaptive_configs.get(
+            "max_size", initial_size * DEFAULT_MAX_SIZE_FACTOR
+        ),
+        max_memory_bytes=max_memory_mb * 1024 * 1024 if max_memory_mb else None,
+        growth_factor=adaptive_configs.get("growth_factor", 1.5),
+        window=adaptive_configs.get("window", 3),
+        log_path=os.path.join(log_dir, "batch_sizes.csv") if log_dir else None,
+    )
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import uuid
+
+import pyarrow
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="BatchCache", package_name=None)
+
+# data stream configs that change the content of the resulting batches
+CACHE_KEY_CONFIGS = [
+    "source",
+    "model_table_or_path",
+    "timestamp_col",
+    "selected_features",
+    "from_date",
+    "to_date",
+    "data_limit",
+    "time_interval",
+    "aggregation",
+    "column_types",
+    "compact_dtypes",
+]
+
+# configs that set the boundaries of resampled batches, which are replayed as cached
+RESAMPLED_CACHE_KEY_CONFIGS = ["data_batch_size", "adaptive_batch_size"]
+
+
+class BatchCache:
+    """
+    Content-addressed cache of fetched, projected and resampled data batches.
+
+    Every entry is an Arrow IPC file under `cache_dir`, named after the hash of
+    the data stream configs that produced it. Entries are only committed once
+    the stream was read completely, and the least recently used entries are
+    evicted when the cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_key(self, data_configs, **extra):
+        key_configs = {name: data_configs.get(name) for name in CACHE_KEY_CONFIGS}
+        if data_configs.get("time_interval"):
+            key_configs.update(
+                {name: data_configs.get(name) for name in RESAMPLED_CACHE_KEY_CONFIGS}
+            )
+        key_configs.update(extra)
+        return hashlib.sha256(
+            json.dumps(key_configs, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    def contains(self, key):
+        return os.path.exists(self.get_path(key))
+
+    def read(self, key):
+        path = self.get_path(key)
+        os.utime(path)
+        LOGGER.info(f"Reading data batches from cache: {path}")
+
+        with pyarrow.memory_map(path) as source:
+            reader = pyarrow.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+    def write(self, key, batches):
+        path = self.get_path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        writer, schema = None, None
+        cacheable, completed = True, False
+
+        try:
+            for ts_batch in batches:
+                if cacheable:
+                    try:
+                        table = pyarrow.Table.from_pandas(
+                            ts_batch, preserve_index=False
+                        )
+                        if writer is None:
+                            schema = table.schema
+                            writer = pyarrow.ipc.new_file(tmp_path, schema)
+                        writer.write_table(table.cast(schema))
+                    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+                        LOGGER.warning(f"Data batches can not be cached: {str(e)}")
+                        cacheable = False
+                yield ts_batch
+            completed = True
+        finally:
+            if writer is not None:
+                writer.close()
+                if cacheable and completed:
+                    os.replace(tmp_path, path)
+                    LOGGER.info(f"Data batches cached at: {path}")
+                    self.evict()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".arrow"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                LOGGER.debug(f"Evicted cached data batches: {name}")
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
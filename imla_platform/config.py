@@ -13,3 +13,23 @@ RABBITMQ_HOST = config("RABBITMQ_HOST", default="localhost", cast=str)
 RABBITMQ_PORT = config("RABBITMQ_PORT", default=5672, cast=int)
 FORECASTING_CONSUMER_QUEUE = config("FORECASTING_CONSUMER_QUEUE")
 FORECASTING_PRODUCER_QUEUE = config("FORECASTING_PRODUCER_QUEUE")
+FORECASTING_INFERENCE_QUEUE = config("FORECASTING_INFERENCE_QUEUE", default="")
+FORECASTING_PROGRESS_INTERVAL = config(
+    "FORECASTING_PROGRESS_INTERVAL", default=1.0, cast=float
+)
+FORECASTING_JOB_SLOTS = config("FORECASTING_JOB_SLOTS", default=1, cast=int)
+FORECASTING_PREDICTION_BUFFER_ROWS = config(
+    "FORECASTING_PREDICTION_BUFFER_ROWS", default=10000, cast=int
+)
+FORECASTING_PREDICTION_FSYNC_INTERVAL = config(
+    "FORECASTING_PREDICTION_FSYNC_INTERVAL", default=5.0, cast=float
+)
+
+RAY_PERSISTENT_RUNTIME = config("RAY_PERSISTENT_RUNTIME", default=False, cast=bool)
+RAY_ADDRESS = config("RAY_ADDRESS", default="", cast=str)
+# prefix of the Ray namespace, which is made unique per worker
+RAY_NAMESPACE = config("RAY_NAMESPACE", default="imla-platform", cast=str)
+RAY_WARMUP = config("RAY_WARMUP", default=True, cast=bool)
+
+MODEL_CACHE_SIZE = config("MODEL_CACHE_SIZE", default=4, cast=int)
+MODEL_CACHE_MAX_MB = config("MODEL_CACHE_MAX_MB", default=2048, cast=int)
@@ -1,17 +1,49 @@
+import glob
+import os
+import re
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from more_utils.logging import configure_logger
-from time import sleep
+from queue import Empty, Full, Queue
+from time import perf_counter, sleep
 import pandas as pd
 import pathlib
+from pyarrow import csv, dataset, flight
 from pyarrow.parquet import ParquetFile
 import pyarrow
 
+from imla_platform.batching import create_batch_size_controller, create_memory_budget
+from imla_platform.cache import BatchCache
+from imla_platform.query import (
+    build_aggregate_query,
+    build_select_query,
+    interval_to_sql,
+)
+from imla_platform.resampling import StreamingResampler, interval_to_nanoseconds
+
 
 LOGGER = configure_logger(logger_name="DataStream", package_name=None)
 
+# SQL type names of numeric columns, e.g. BIGINT, FLOAT4 or DOUBLE PRECISION
+NUMERIC_TYPE_PATTERN = re.compile(
+    r"(u?int|integer|bigint|smallint|tinyint|float|double|real|decimal|numeric)"
+    r"\d*( precision)?(\(.*\))?",
+    re.IGNORECASE,
+)
+
 
 class DataStream:
     def __init__(self, data_stream) -> None:
         self.data_configs = data_stream
+        self.resampler_ = None
+        self.aggregated_ = False
+        self.batch_cache_ = None
+        self.batch_size_controller_ = None
+        self.memory_budget_ = None
+        self.rows_processed_ = 0
+        self.watermark_ = None
+        self.start_time_ = None
 
     def get_training_params(self, final_estimator_name):
         fit_params = {}
@@ -25,13 +57,22 @@ class DataStream:
 
         return target, timestamp_col, fit_params
 
+    def get_targets(self):
+        return get_targets(self.data_configs)
+
+    def select_features(self, features):
+        selected_features = self.data_configs["selected_features"]
+        if selected_features:
+            return [feature for feature in features if feature in selected_features]
+        return list(features)
+
     def validate_batch(self, ts_batch):
-        if ts_batch.shape[0] <= 0:
+        if len(ts_batch) <= 0:
             LOGGER.error(
                 f"Empty Time-series batch received. Ignoring bad time-series batch."
             )
             return False
-        elif list(ts_batch.columns) != self.features_:
+        elif batch_columns(ts_batch) != self.features_:
             LOGGER.error(
                 f"Missing features in a current batch: {list(set(self.features_).intersection(set(ts_batch.columns)))}. Ignoring bad time-series batch."
             )
@@ -39,8 +80,26 @@ class DataStream:
 
         return True
 
+    def create_resampler(self):
+        time_interval = self.data_configs["time_interval"]
+        if not time_interval or self.aggregated_:
+            return None
+        elif interval_to_nanoseconds(time_interval) is None:
+            LOGGER.warning(
+                f"Time interval {time_interval} is not a fixed frequency. Each batch will be resampled separately."
+            )
+            return None
+
+        return StreamingResampler(
+            time_interval,
+            self.data_configs["timestamp_col"],
+            self.data_configs.get("aggregation") or "mean",
+        )
+
     def apply_granularity(self, df):
-        if self.data_configs["time_interval"]:
+        if self.resampler_ is not None:
+            df = self.resampler_.update(df)
+        elif self.data_configs["time_interval"] and not self.aggregated_:
             df_granularity = (
                 df.set_index(self.data_configs["timestamp_col"])
                 .resample(self.data_configs["time_interval"])
@@ -50,36 +109,652 @@ class DataStream:
                 columns={"index": self.data_configs["timestamp_col"]}
             )
         return df
-    
+
+    def current_batch_size(self):
+        if self.batch_size_controller_ is not None:
+            batch_size = self.batch_size_controller_.batch_size
+        else:
+            batch_size = self.data_configs["data_batch_size"]
+
+        # shrink reads so the prefetched and the processed batch fit the budget
+        if self.memory_budget_ is not None:
+            max_rows = self.memory_budget_.max_rows(
+                (self.data_configs.get("prefetch_batches") or 0) + 1
+            )
+            if max_rows is not None and max_rows < batch_size:
+                batch_size = max_rows
+        return batch_size
+
+    def record_batch(self, ts_batch, predict_time, train_time):
+        self.rows_processed_ += len(ts_batch)
+        timestamp_col = self.data_configs["timestamp_col"]
+        if timestamp_col and len(ts_batch) > 0:
+            self.watermark_ = max_timestamp(
+                self.watermark_, ts_batch[timestamp_col].max()
+            )
+
+        nbytes = ts_batch.attrs.get("nbytes")
+        if nbytes is None:
+            nbytes = batch_nbytes(ts_batch)
+
+        if self.memory_budget_ is not None:
+            self.memory_budget_.release(nbytes)
+        if self.batch_size_controller_ is not None:
+            self.batch_size_controller_.record(
+                len(ts_batch),
+                nbytes,
+                predict_time,
+                train_time,
+                fetch_time=ts_batch.attrs.get("fetch_time", 0.0),
+                raw_rows=ts_batch.attrs.get("raw_rows"),
+                raw_nbytes=ts_batch.attrs.get("raw_nbytes"),
+            )
+
+    def get_progress(self):
+        elapsed = perf_counter() - self.start_time_ if self.start_time_ else 0.0
+        return {
+            "rows_processed": self.rows_processed_,
+            "watermark": str(self.watermark_) if self.watermark_ is not None else None,
+            "rows_per_second": self.rows_processed_ / elapsed if elapsed > 0 else 0.0,
+            # bytes of data batches held at once, None without a memory budget
+            "memory_high_water_mark": self.get_memory_high_water_mark(),
+        }
+
+    def iter_budgeted(self, batches):
+        for ts_batch in batches:
+            nbytes = batch_nbytes(ts_batch)
+            ts_batch.attrs["nbytes"] = nbytes
+            self.memory_budget_.acquire(nbytes, len(ts_batch))
+            yield ts_batch
+
+    def get_memory_high_water_mark(self):
+        if self.memory_budget_ is not None:
+            return self.memory_budget_.high_water_mark
+        return None
+
+    def iter_timed(self, data_session):
+        data_session = iter(data_session)
+        while True:
+            start = perf_counter()
+            try:
+                ts_batch = next(data_session)
+            except StopIteration:
+                break
+            yield ts_batch, perf_counter() - start
+
+    def iter_batches(self, data_session):
+        # The fetch time and size of raw batches that are dropped or merged by
+        # resampling are carried over to the next emitted batch.
+        self.resampler_ = self.create_resampler()
+        fetch_time, raw_rows, raw_nbytes = 0.0, 0, 0
+        for ts_batch, batch_fetch_time in self.iter_timed(data_session):
+            fetch_time += batch_fetch_time
+            if self.batch_size_controller_ is not None:
+                raw_rows += len(ts_batch)
+                raw_nbytes += batch_nbytes(ts_batch)
+            if self.validate_batch(ts_batch):
+                ts_batch = self.apply_granularity(to_pandas(ts_batch))
+                if len(ts_batch) > 0:
+                    yield set_fetch_stats(
+                        self.apply_dtypes(ts_batch), fetch_time, raw_rows, raw_nbytes
+                    )
+                    fetch_time, raw_rows, raw_nbytes = 0.0, 0, 0
+
+        if self.resampler_ is not None:
+            ts_batch = self.resampler_.flush()
+            if len(ts_batch) > 0:
+                yield set_fetch_stats(
+                    self.apply_dtypes(ts_batch), fetch_time, raw_rows, raw_nbytes
+                )
+
+    def iter_cached(self, cache_key):
+        # Cached batches are cut to the batch size of this run. Resampled batches
+        # keep their boundaries, which depend on the raw batches they came from,
+        # so replaying them trains on the same batches as an uncached run.
+        batches = self.batch_cache_.read(cache_key)
+        if not self.data_configs["time_interval"]:
+            batches = rebatch(batches, self.current_batch_size)
+        for ts_batch, fetch_time in self.iter_timed(batches):
+            ts_batch = to_pandas(ts_batch)
+            yield set_fetch_stats(ts_batch, fetch_time, len(ts_batch), None)
+
+    def apply_dtypes(self, df):
+        if self.data_configs.get("compact_dtypes"):
+            df = compact_dtypes(
+                df, self.data_configs["timestamp_col"], self.get_targets()
+            )
+        return df
+
+    def limit_rows(self, batches, total_rows=None):
+        n_rows = 0
+        for ts_batch in batches:
+            if total_rows:
+                if n_rows >= total_rows:
+                    break
+                elif n_rows + len(ts_batch) > total_rows:
+                    ts_batch = slice_batch(ts_batch, 0, total_rows - n_rows)
+            n_rows += len(ts_batch)
+            yield ts_batch
+
+    def is_cacheable(self):
+        return True
+
+    def get_cache_key(self):
+        return self.batch_cache_.get_key(self.data_configs)
+
+    def get_batches(self):
+        self.start_time_ = perf_counter()
+        if self.batch_cache_ is not None and self.is_cacheable():
+            cache_key = self.get_cache_key()
+            if self.batch_cache_.contains(cache_key):
+                batches = self.iter_cached(cache_key)
+            else:
+                batches = self.batch_cache_.write(
+                    cache_key, self.iter_batches(self.get_data_session())
+                )
+        else:
+            batches = self.iter_batches(self.get_data_session())
+
+        if self.memory_budget_ is not None:
+            batches = self.iter_budgeted(batches)
+
+        prefetch_batches = self.data_configs.get("prefetch_batches")
+        if prefetch_batches:
+            LOGGER.info(f"Prefetching up to {prefetch_batches} data batches ahead.")
+            return PrefetchingDataSession(
+                batches,
+                prefetch_batches,
+                on_close=self.memory_budget_.close if self.memory_budget_ else None,
+            )
+        return batches
+
     def wait(self):
         sleep(self.data_configs["data_ingestion_freq"])
 
 
+class PrefetchingDataSession:
+    """
+    Iterates over the batches of a data session while a background thread
+    fetches, validates and resamples up to `prefetch_batches` batches ahead.
+    """
+
+    _END = object()
+
+    def __init__(self, batches, prefetch_batches, on_close=None) -> None:
+        self.batches = batches
+        self.on_close = on_close
+        self.queue = Queue(maxsize=prefetch_batches)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.produce, name="DataStreamPrefetcher", daemon=True
+        )
+        self.thread.start()
+
+    def produce(self):
+        try:
+            for ts_batch in self.batches:
+                if not self.put(ts_batch):
+                    break
+        except Exception as e:
+            self.put(e)
+        finally:
+            if self.stop_event.is_set() and hasattr(self.batches, "close"):
+                self.batches.close()
+            self.put(self._END)
+
+    def put(self, item):
+        return put_until_stopped(self.queue, item, self.stop_event)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.stop_event.is_set():
+            raise StopIteration
+
+        item = self.queue.get()
+        if item is self._END:
+            self.stop_event.set()
+            raise StopIteration
+        elif isinstance(item, Exception):
+            self.stop_event.set()
+            raise item
+        return item
+
+    def close(self):
+        self.stop_event.set()
+        if self.on_close is not None:
+            self.on_close()
+        while self.thread.is_alive():
+            try:
+                self.queue.get(timeout=0.1)
+            except Empty:
+                continue
+        self.thread.join()
+
+
 class ModelarDBDataStream(DataStream):
-    def __init__(self, data_stream, ts_factory) -> None:
+    def __init__(self, data_stream, modelardb_conn) -> None:
         super(ModelarDBDataStream, self).__init__(data_stream)
-        self.ts_factory = ts_factory
+        self.modelardb_conn = modelardb_conn
+        self.aggregation_columns_ = None
 
     def get_data_session(self):
-        time_series = self.ts_factory.create_time_series(
-            model_table=self.data_configs["model_table_or_path"],
-            from_date=self.data_configs["from_date"],
+        if self.data_configs.get("follow"):
+            return self.get_follow_session()
+
+        time_slices = self.get_time_slices()
+        queries = [self.build_query(*time_slice) for time_slice in time_slices]
+        LOGGER.debug(f"Querying ModelarDB: {queries}")
+
+        cursor = self.modelardb_conn.cursor()
+        cursor.execute(queries[0])
+        features = [column[0] for column in cursor.description]
+
+        target = self.get_targets()
+        if len(queries) > 1:
+            LOGGER.info(
+                f"Fetching {len(queries)} time slices in parallel between {self.data_configs['from_date']} and {self.data_configs['to_date']}."
+            )
+            data_session = self.iter_time_slices(cursor, queries, features)
+        else:
+            data_session = self.iter_cursor(cursor, features)
+        LOGGER.info(
+            f"Data session created. Time-series found with features: {list(set(features) - set(target))} and target: {target}"
+        )
+        self.features_ = features
+
+        return data_session
+
+    def is_cacheable(self):
+        # rows can still be ingested into an open ended time range
+        return bool(self.data_configs["to_date"]) and not self.data_configs.get(
+            "follow"
+        )
+
+    def get_follow_session(self):
+        if not self.data_configs["timestamp_col"]:
+            raise Exception(
+                "Follow mode requires the timestamp_col of the time-series."
+            )
+
+        cursor = self.modelardb_conn.cursor()
+        cursor.execute(self.build_follow_query(None, self.data_configs["data_limit"]))
+        features = [column[0] for column in cursor.description]
+
+        target = self.get_targets()
+        LOGGER.info(
+            f"Data session created in follow mode. Time-series found with features: {list(set(features) - set(target))} and target: {target}"
+        )
+        self.features_ = features
+
+        return self.iter_follow(cursor, features)
+
+    def build_follow_query(self, watermark, limit):
+        return build_select_query(
+            self.data_configs["model_table_or_path"],
+            columns=self.data_configs["selected_features"],
+            timestamp_col=self.data_configs["timestamp_col"],
+            from_date=(
+                watermark if watermark is not None else self.data_configs["from_date"]
+            ),
             to_date=self.data_configs["to_date"],
-            limit=self.data_configs["data_limit"],
+            order_by_time=True,
+            limit=limit,
         )
 
-        features = list(time_series.columns)
-        target = self.data_configs["target"]
-        data_session = time_series.fetch_next(
-            batch_size=self.data_configs["data_batch_size"]
+    def iter_follow(self, cursor, features):
+        # Rows from the high-water mark on are polled until to_date or
+        # data_limit is reached. Polling backs off exponentially while no new
+        # rows arrive. Every poll includes the high-water mark itself, as rows
+        # of other series can still arrive with that timestamp, and the rows
+        # already returned at the mark are dropped.
+        follow_configs = self.data_configs["follow"]
+        if not isinstance(follow_configs, dict):
+            follow_configs = {}
+        min_poll_interval = follow_configs.get("min_poll_interval", 1)
+        max_poll_interval = follow_configs.get("max_poll_interval", 60)
+
+        timestamp_col = self.data_configs["timestamp_col"]
+        to_date = self.data_configs["to_date"]
+        data_limit = self.data_configs["data_limit"]
+        watermark, n_rows = None, 0
+        seen_rows = Counter()
+        poll_interval = min_poll_interval
+
+        while True:
+            n_new_rows = 0
+            unseen_rows = Counter(seen_rows)
+            for ts_batch in self.iter_cursor(cursor, features):
+                ts_batch = drop_seen_rows(
+                    ts_batch, timestamp_col, watermark, unseen_rows
+                )
+                if ts_batch.empty:
+                    continue
+
+                n_new_rows += len(ts_batch)
+                timestamps = pd.to_datetime(ts_batch[timestamp_col])
+                new_watermark = max_timestamp(watermark, timestamps.max())
+                if new_watermark != watermark:
+                    watermark = new_watermark
+                    seen_rows = Counter()
+                seen_rows.update(row_keys(ts_batch[(timestamps == watermark).values]))
+                yield ts_batch
+
+            n_rows += n_new_rows
+            if (data_limit and n_rows >= data_limit) or (
+                to_date and watermark is not None and watermark >= pd.Timestamp(to_date)
+            ):
+                break
+
+            if n_new_rows > 0:
+                poll_interval = min_poll_interval
+                LOGGER.debug(f"Following time-series. High-water mark: {watermark}")
+            else:
+                sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, max_poll_interval)
+
+            cursor = self.modelardb_conn.cursor()
+            # the rows at the high-water mark are returned again
+            cursor.execute(
+                self.build_follow_query(
+                    watermark,
+                    (
+                        data_limit - n_rows + sum(seen_rows.values())
+                        if data_limit
+                        else None
+                    ),
+                )
+            )
+
+    def get_time_slices(self):
+        parallel_fetch = self.data_configs.get("parallel_fetch") or 1
+        if parallel_fetch <= 1:
+            return [()]
+        elif not (self.data_configs["from_date"] and self.data_configs["to_date"]):
+            LOGGER.warning(
+                "parallel_fetch requires both from_date and to_date. Fetching data sequentially."
+            )
+            return [()]
+        elif self.data_configs["data_limit"]:
+            LOGGER.warning(
+                "parallel_fetch cannot be combined with data_limit. Fetching data sequentially."
+            )
+            return [()]
+
+        from_date = pd.Timestamp(self.data_configs["from_date"]).value
+        to_date = pd.Timestamp(self.data_configs["to_date"]).value
+        boundaries = [
+            from_date + (to_date - from_date) * i // parallel_fetch
+            for i in range(1, parallel_fetch)
+        ]
+
+        # Keep every aggregation bucket inside a single slice.
+        time_interval = self.data_configs["time_interval"]
+        if time_interval and interval_to_sql(time_interval):
+            interval = interval_to_nanoseconds(time_interval)
+            boundaries = [boundary // interval * interval for boundary in boundaries]
+
+        boundaries = sorted(
+            set(boundary for boundary in boundaries if from_date < boundary < to_date)
+        )
+        boundaries = [from_date] + boundaries + [to_date]
+        return [
+            (
+                pd.Timestamp(start),
+                pd.Timestamp(end),
+                i == len(boundaries) - 2,
+            )
+            for i, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:]))
+        ]
+
+    def build_query(self, from_date=None, to_date=None, to_inclusive=True):
+        model_table = self.data_configs["model_table_or_path"]
+        timestamp_col = self.data_configs["timestamp_col"]
+        query_params = {
+            "timestamp_col": timestamp_col,
+            "from_date": from_date or self.data_configs["from_date"],
+            "to_date": to_date or self.data_configs["to_date"],
+            "to_inclusive": to_inclusive,
+            "limit": self.data_configs["data_limit"],
+        }
+
+        time_interval = self.data_configs["time_interval"]
+        if (
+            time_interval
+            and timestamp_col
+            and interval_to_sql(time_interval)
+            and not self.data_configs.get("follow")
+        ):
+            if self.aggregation_columns_ is None:
+                self.aggregation_columns_ = self.get_aggregation_columns()
+            value_columns, group_columns = self.aggregation_columns_
+            self.aggregated_ = True
+            return build_aggregate_query(
+                model_table,
+                value_columns=value_columns,
+                group_columns=group_columns,
+                time_interval=time_interval,
+                aggregation=self.data_configs.get("aggregation") or "mean",
+                **query_params,
+            )
+
+        # rows of a slice are emitted in timestamp order as well
+        return build_select_query(
+            model_table,
+            columns=self.data_configs["selected_features"],
+            order_by_time=bool(timestamp_col),
+            **query_params,
+        )
+
+    def get_aggregation_columns(self):
+        # Numeric fields are aggregated while the remaining columns (tags) are
+        # grouped by, so every tag keeps its own time series.
+        cursor = self.modelardb_conn.cursor()
+        try:
+            cursor.execute(
+                build_select_query(
+                    self.data_configs["model_table_or_path"],
+                    columns=self.data_configs["selected_features"],
+                    limit=1,
+                )
+            )
+            sample = cursor.fetchmany(1)
+            description = cursor.description
+        finally:
+            cursor.close()
+
+        value_columns, group_columns = [], []
+        for i, column in enumerate(description):
+            if column[0] == self.data_configs["timestamp_col"]:
+                continue
+            # a NULL in the sampled row says nothing about the column type
+            value = sample[0][i] if sample else None
+            if is_numeric_column(column[1], value):
+                value_columns.append(column[0])
+            else:
+                group_columns.append(column[0])
+        return value_columns, group_columns
+
+    def iter_time_slices(self, first_cursor, queries, columns):
+        # Every slice is fetched into its own bounded queue and the queues are
+        # drained in order, so batches are still emitted in timestamp order.
+        buffer_size = self.data_configs.get("parallel_fetch_buffer") or 8
+        slice_queues = [Queue(maxsize=buffer_size) for _ in queries]
+        stop_event = threading.Event()
+
+        def fetch(i, query):
+            slice_queue = slice_queues[i]
+            try:
+                if i == 0:
+                    cursor = first_cursor
+                else:
+                    cursor = self.modelardb_conn.cursor()
+                    cursor.execute(query)
+
+                batches = self.iter_cursor(cursor, columns)
+                for ts_batch in batches:
+                    if not put_until_stopped(slice_queue, ts_batch, stop_event):
+                        batches.close()
+                        break
+            except Exception as e:
+                put_until_stopped(slice_queue, e, stop_event)
+            finally:
+                put_until_stopped(slice_queue, None, stop_event)
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(queries), thread_name_prefix="ModelarDBFetch"
+        )
+        for i, query in enumerate(queries):
+            executor.submit(fetch, i, query)
+
+        try:
+            for slice_queue in slice_queues:
+                while True:
+                    ts_batch = slice_queue.get()
+                    if ts_batch is None:
+                        break
+                    elif isinstance(ts_batch, Exception):
+                        raise ts_batch
+                    yield ts_batch
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_cursor(self, cursor, columns):
+        try:
+            while True:
+                rows = cursor.fetchmany(self.current_batch_size())
+                if not rows:
+                    break
+                yield pd.DataFrame.from_records(rows, columns=columns)
+        finally:
+            cursor.close()
+
+
+class FlightDataStream(ModelarDBDataStream):
+    """
+    Queries ModelarDB through Apache Arrow Flight and reads all endpoints of the
+    query concurrently, e.g. one per node of a clustered deployment.
+    """
+
+    _DONE = object()
+
+    def get_data_session(self):
+        client = flight.FlightClient(self.data_configs["flight_location"])
+        query = self.build_query()
+        LOGGER.debug(f"Querying ModelarDB through Arrow Flight: {query}")
+
+        try:
+            flight_info = client.get_flight_info(
+                flight.FlightDescriptor.for_command(query)
+            )
+            # an empty result can come without any endpoint
+            schema = flight_info.schema
+            readers = [
+                self.get_endpoint_client(client, endpoint).do_get(endpoint.ticket)
+                for endpoint in flight_info.endpoints
+            ]
+        except (flight.FlightUnavailableError, NotImplementedError) as e:
+            LOGGER.debug(
+                f"Flight info not available ({str(e)}), using a single stream."
+            )
+            readers = [client.do_get(flight.Ticket(query))]
+            schema = readers[0].schema
+        if readers:
+            LOGGER.info(
+                f"Reading {len(readers)} Arrow Flight endpoint(s) concurrently."
+            )
+        else:
+            LOGGER.warning("Arrow Flight query returned no endpoints. No data to read.")
+
+        features = schema.names
+        target = self.get_targets()
+        data_session = self.limit_rows(
+            rebatch(
+                self.iter_flight_streams(readers),
+                self.current_batch_size,
+            ),
+            self.data_configs["data_limit"],
         )
         LOGGER.info(
-            f"Data session created. Time-series found with features: {list(set(features) - set([target]))} and target: {target}"
+            f"Data session created. Time-series found with features: {list(set(features) - set(target))} and target: {target}"
         )
         self.features_ = features
 
         return data_session
 
+    def get_endpoint_client(self, client, endpoint):
+        if endpoint.locations:
+            return flight.FlightClient(endpoint.locations[0])
+        return client
+
+    def get_aggregation_columns(self):
+        client = flight.FlightClient(self.data_configs["flight_location"])
+        reader = client.do_get(
+            flight.Ticket(
+                build_select_query(
+                    self.data_configs["model_table_or_path"],
+                    columns=self.data_configs["selected_features"],
+                    limit=1,
+                )
+            )
+        )
+        schema = reader.schema
+        reader.cancel()
+
+        value_columns, group_columns = [], []
+        for field in schema:
+            if field.name == self.data_configs["timestamp_col"]:
+                continue
+            elif pyarrow.types.is_integer(field.type) or pyarrow.types.is_floating(
+                field.type
+            ):
+                value_columns.append(field.name)
+            else:
+                group_columns.append(field.name)
+        return value_columns, group_columns
+
+    def iter_flight_streams(self, readers):
+        batches = Queue(maxsize=2 * len(readers))
+        stop_event = threading.Event()
+
+        def put(item):
+            return put_until_stopped(batches, item, stop_event)
+
+        def read(reader):
+            try:
+                for chunk in reader:
+                    if not put(chunk.data):
+                        reader.cancel()
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                put(self._DONE)
+
+        threads = [
+            threading.Thread(target=read, args=(reader,), daemon=True)
+            for reader in readers
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            n_running = len(threads)
+            while n_running > 0:
+                item = batches.get()
+                if item is self._DONE:
+                    n_running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+
 
 class LocalDataStream(DataStream):
     def __init__(self, data_stream, *args, **kwargs) -> None:
@@ -88,73 +763,401 @@ class LocalDataStream(DataStream):
     def get_data_session(self):
         file_path = self.data_configs["model_table_or_path"]
         extension = pathlib.Path(file_path).suffix
-        if ".csv" == extension.lower():
-            time_series_df = pd.read_csv(
-                file_path,
-                usecols=self.data_configs["selected_features"],
-                nrows=self.data_configs["data_limit"],
-                chunksize=self.data_configs["data_batch_size"],
-            )
-            # reading again a single row to get feature names
-            features = list(
-                pd.read_csv(
-                    file_path,
-                    nrows=1,
-                ).columns
+        if is_partitioned_path(file_path):
+            dataset = self.open_dataset(file_path)
+            features = self.select_features(dataset.schema.names)
+            time_series_df = self.limit_rows(
+                rebatch(self.iter_dataset(dataset, features), self.current_batch_size),
+                self.data_configs["data_limit"],
+            )
+        elif ".csv" == extension.lower():
+            csv_reader = self.open_csv_file(file_path)
+            features = csv_reader.schema.names
+            time_series_df = self.limit_rows(
+                rebatch(csv_reader, self.current_batch_size),
+                self.data_configs["data_limit"],
             )
         elif ".parquet" == extension.lower():
-            parquet_file = ParquetFile(file_path)
-            features = parquet_file.schema.names
+            parquet_file = ParquetFile(
+                file_path, memory_map=self.data_configs.get("memory_map", False)
+            )
+            features = self.select_features(parquet_file.schema_arrow.names)
             time_series_df = self.iter_parquet_file(
                 parquet_file,
-                self.data_configs["data_batch_size"],
                 self.data_configs["data_limit"],
-                self.data_configs["selected_features"],
+                features,
             )
         else:
             raise Exception(
-                f"Invalid local file path for the data stream: {file_path}. Only files with the extension as .parquet and .csv are accepted."
+                f"Invalid local file path for the data stream: {file_path}. Only files with the extension as .parquet and .csv, directories or glob patterns of parquet files are accepted."
             )
 
-        target = self.data_configs["target"]
+        target = self.get_targets()
         data_session = time_series_df
 
         LOGGER.info(
-            f"Data session created. Time-series found with features: {list(set(features) - set([target]))} and target: {target}"
+            f"Data session created. Time-series found with features: {list(set(features) - set(target))} and target: {target}"
         )
         self.features_ = features
 
         return data_session
 
-    def iter_parquet_file(
-        self, parquet_file, batch_size, total_rows=None, selected_features=None
-    ):
-        n_rows = 0
-        batch_gen = parquet_file.iter_batches(
-            columns=selected_features,
-            use_threads=True,
-            batch_size=batch_size,
+    def get_cache_key(self):
+        stats = [
+            os.stat(path)
+            for path in list_local_files(self.data_configs["model_table_or_path"])
+        ]
+        return self.batch_cache_.get_key(
+            self.data_configs,
+            file_mtime=max(stat.st_mtime_ns for stat in stats),
+            file_size=sum(stat.st_size for stat in stats),
+            n_files=len(stats),
         )
 
-        def check_loop_condition(n_rows, total_rows):
-            if total_rows:
-                return n_rows < total_rows
+    def open_dataset(self, path):
+        files = list_local_files(path)
+        if not files:
+            raise Exception(f"No parquet files found for the data stream: {path}")
+
+        base_dir = path if os.path.isdir(path) else os.path.dirname(path.split("*")[0])
+        return dataset.dataset(
+            files,
+            format="parquet",
+            partitioning="hive",
+            partition_base_dir=base_dir,
+        )
+
+    def build_dataset_filter(self, schema):
+        timestamp_col = self.data_configs["timestamp_col"]
+        if not timestamp_col:
+            return None
+
+        time_filter = None
+        timestamp_type = schema.field(timestamp_col).type
+        for date, compare in [
+            (self.data_configs["from_date"], lambda field, value: field >= value),
+            (self.data_configs["to_date"], lambda field, value: field <= value),
+        ]:
+            if date:
+                value = pyarrow.scalar(
+                    pd.Timestamp(date).to_pydatetime(), type=timestamp_type
+                )
+                condition = compare(dataset.field(timestamp_col), value)
+                time_filter = (
+                    condition if time_filter is None else time_filter & condition
+                )
+        return time_filter
+
+    def get_dataset_row_groups(self, ts_dataset, time_filter):
+        # Files and row groups whose partition values or statistics do not
+        # match the time filter are skipped here without being read.
+        row_groups = [
+            row_group
+            for fragment in ts_dataset.get_fragments(filter=time_filter)
+            for row_group in fragment.split_by_row_group(filter=time_filter)
+        ]
+
+        timestamp_col = self.data_configs["timestamp_col"]
+        if not timestamp_col:
+            return [[row_group] for row_group in row_groups]
+
+        ranges = []
+        for row_group in row_groups:
+            statistics = row_group.row_groups[0].statistics or {}
+            if timestamp_col not in statistics:
+                LOGGER.warning(
+                    f"Parquet files have no statistics for {timestamp_col}. Batches are only ordered within each row group."
+                )
+                return [[row_group] for row_group in row_groups]
+            ranges.append(
+                (
+                    statistics[timestamp_col]["min"],
+                    statistics[timestamp_col]["max"],
+                    row_group,
+                )
+            )
+
+        # Row groups with overlapping time ranges (e.g. several turbines on
+        # the same day) are read together and merged by timestamp.
+        groups, max_timestamp = [], None
+        for min_timestamp, group_max_timestamp, row_group in sorted(
+            ranges, key=lambda item: item[0]
+        ):
+            if groups and min_timestamp <= max_timestamp:
+                groups[-1].append(row_group)
+                max_timestamp = max(max_timestamp, group_max_timestamp)
             else:
-                return True
+                groups.append([row_group])
+                max_timestamp = group_max_timestamp
+        return groups
 
-        while check_loop_condition(n_rows, total_rows):
-            yield pyarrow.Table.from_batches([next(batch_gen)]).to_pandas()
-            n_rows += batch_size
+    def iter_dataset(self, ts_dataset, features):
+        time_filter = self.build_dataset_filter(ts_dataset.schema)
+        groups = self.get_dataset_row_groups(ts_dataset, time_filter)
+        LOGGER.info(
+            f"Reading {sum(len(group) for group in groups)} row groups in {len(groups)} time ordered groups."
+        )
+
+        n_readers = self.data_configs.get("parallel_fetch") or os.cpu_count() or 1
+        executor = ThreadPoolExecutor(
+            max_workers=n_readers, thread_name_prefix="DatasetReader"
+        )
+        row_groups = iter([row_group for group in groups for row_group in group])
+        pending = deque()
+
+        def submit_next():
+            row_group = next(row_groups, None)
+            if row_group is not None:
+                pending.append(
+                    executor.submit(
+                        row_group.to_table,
+                        schema=ts_dataset.schema,
+                        filter=time_filter,
+                        columns=features,
+                        use_threads=False,
+                    )
+                )
+
+        try:
+            for _ in range(n_readers):
+                submit_next()
+
+            for group in groups:
+                tables = []
+                for _ in group:
+                    tables.append(pending.popleft().result())
+                    submit_next()
+
+                table = pyarrow.concat_tables(tables)
+                if len(tables) > 1:
+                    table = table.sort_by(self.data_configs["timestamp_col"])
+                yield from table.to_batches()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def open_csv_file(self, file_path):
+        column_types = {
+            column: pyarrow.type_for_alias(dtype)
+            for column, dtype in (self.data_configs.get("column_types") or {}).items()
+        }
+        read_options = csv.ReadOptions(use_threads=True)
+        if self.data_configs.get("csv_block_size"):
+            read_options.block_size = self.data_configs["csv_block_size"]
+
+        return csv.open_csv(
+            file_path,
+            read_options=read_options,
+            convert_options=csv.ConvertOptions(
+                column_types=column_types,
+                include_columns=self.data_configs["selected_features"],
+            ),
+        )
+
+    def iter_parquet_file(self, parquet_file, total_rows=None, selected_features=None):
+        # Batches never span two row groups, so every batch is a zero-copy
+        # slice of a single decoded row group.
+        def iter_row_groups():
+            for row_group in range(parquet_file.num_row_groups):
+                table = parquet_file.read_row_group(
+                    row_group, columns=selected_features, use_threads=True
+                )
+                offset = 0
+                while offset < table.num_rows:
+                    batch_size = self.current_batch_size()
+                    yield table.slice(offset, batch_size)
+                    offset += batch_size
+
+        return self.limit_rows(iter_row_groups(), total_rows)
+
+
+def is_partitioned_path(path):
+    return os.path.isdir(path) or any(char in path for char in "*?[")
+
+
+def list_local_files(path):
+    if os.path.isdir(path):
+        return sorted(
+            str(file_path)
+            for file_path in pathlib.Path(path).rglob("*")
+            if file_path.is_file() and not file_path.name.startswith((".", "_"))
+        )
+    elif is_partitioned_path(path):
+        return sorted(glob.glob(path, recursive=True))
+    return [path]
+
+
+def max_timestamp(watermark, timestamp):
+    timestamp = pd.Timestamp(timestamp)
+    if watermark is None or timestamp > watermark:
+        return timestamp
+    return watermark
+
+
+def row_keys(ts_batch):
+    # str() keeps NULLs and NaNs comparable between polls
+    return [
+        tuple(str(value) for value in row)
+        for row in ts_batch.itertuples(index=False, name=None)
+    ]
+
+
+def drop_seen_rows(ts_batch, timestamp_col, watermark, seen_rows):
+    """
+    Drops the rows at the high-water mark that an earlier poll already returned.
+    `seen_rows` counts those rows and is consumed, so duplicate rows are kept
+    as often as they were not seen before.
+    """
+    if watermark is None or not +seen_rows:
+        return ts_batch
+
+    at_watermark = (pd.to_datetime(ts_batch[timestamp_col]) == watermark).values
+    keep = ~at_watermark
+    for i, key in zip(at_watermark.nonzero()[0], row_keys(ts_batch[at_watermark])):
+        if seen_rows[key] > 0:
+            seen_rows[key] -= 1
+        else:
+            keep[i] = True
+    return ts_batch if keep.all() else ts_batch[keep]
+
+
+def is_numeric_column(type_code, value=None):
+    """
+    Classifies a column from the type code of its cursor description and only
+    falls back to a sampled value if the driver reports no usable type code.
+    """
+    if isinstance(type_code, pyarrow.DataType):
+        return pyarrow.types.is_integer(type_code) or pyarrow.types.is_floating(
+            type_code
+        )
+    if isinstance(type_code, type):
+        return issubclass(type_code, (int, float)) and not issubclass(type_code, bool)
+    if isinstance(type_code, str):
+        return NUMERIC_TYPE_PATTERN.fullmatch(type_code.strip()) is not None
+    return value is None or (
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+    )
+
+
+def put_until_stopped(queue, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def batch_columns(ts_batch):
+    if isinstance(ts_batch, (pyarrow.Table, pyarrow.RecordBatch)):
+        return ts_batch.schema.names
+    return list(ts_batch.columns)
+
+
+def compact_dtypes(df, timestamp_col=None, targets=()):
+    """
+    Downcasts a batch to float32 features, categorical tags and int64
+    nanosecond timestamps. The targets keep their dtype, e.g. float precision
+    or the string labels of a classification.
+    """
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if column == timestamp_col or column in targets:
+            continue
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[column] = "float32"
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            dtypes[column] = "category"
+    if dtypes:
+        df = df.astype(dtypes, copy=False)
+
+    if timestamp_col and pd.api.types.is_datetime64_any_dtype(df[timestamp_col]):
+        timestamps = df[timestamp_col]
+        if getattr(timestamps.dt, "tz", None) is not None:
+            timestamps = timestamps.dt.tz_convert(None)
+        df[timestamp_col] = timestamps.to_numpy(dtype="datetime64[ns]").view("int64")
+        # kept in the pandas metadata of cached batches as well
+        df.attrs["timestamp_unit"] = "ns"
+    return df
+
+
+def get_targets(data_configs):
+    target = data_configs["target"]
+    return list(target) if isinstance(target, (list, tuple)) else [target]
+
+
+def set_fetch_stats(ts_batch, fetch_time, raw_rows, raw_nbytes):
+    # raw_rows and raw_nbytes are the size of the fetched rows before resampling
+    ts_batch.attrs["fetch_time"] = fetch_time
+    ts_batch.attrs["raw_rows"] = raw_rows or None
+    ts_batch.attrs["raw_nbytes"] = raw_nbytes or None
+    return ts_batch
+
+
+def batch_nbytes(ts_batch):
+    if isinstance(ts_batch, (pyarrow.Table, pyarrow.RecordBatch)):
+        return ts_batch.nbytes
+    return int(ts_batch.memory_usage(index=True, deep=True).sum())
+
+
+def slice_batch(ts_batch, offset, length):
+    if isinstance(ts_batch, (pyarrow.Table, pyarrow.RecordBatch)):
+        return ts_batch.slice(offset, length)
+    return ts_batch.iloc[offset : offset + length]
+
+
+def rebatch(batches, get_batch_size):
+    pending, n_pending = [], 0
+    for batch in batches:
+        pending.append(batch)
+        n_pending += len(batch)
+        batch_size = get_batch_size()
+        if n_pending >= batch_size:
+            table = pyarrow.Table.from_batches(pending)
+            offset = 0
+            while n_pending - offset >= batch_size:
+                yield table.slice(offset, batch_size)
+                offset += batch_size
+                batch_size = get_batch_size()
+            pending = table.slice(offset).to_batches()
+            n_pending -= offset
+    if n_pending > 0:
+        yield pyarrow.Table.from_batches(pending)
+
+
+def to_pandas(ts_batch):
+    if isinstance(ts_batch, pyarrow.RecordBatch):
+        ts_batch = pyarrow.Table.from_batches([ts_batch])
+    if isinstance(ts_batch, pyarrow.Table):
+        # split_blocks avoids consolidating columns into one 2D block, which
+        # lets pandas reuse the Arrow buffers for null-free numeric columns.
+        return ts_batch.to_pandas(split_blocks=True, self_destruct=True)
+    return ts_batch
 
 
 class DataStreamFactory:
     @classmethod
-    def create_data_stream(cls, data_stream, *args, **kwargs):
+    def create_data_stream(
+        cls, data_stream, *args, data_dir=None, exp_dir=None, **kwargs
+    ):
         if "modelardb" == data_stream["source"]:
-            return ModelarDBDataStream(data_stream, *args, **kwargs)
+            stream = ModelarDBDataStream(data_stream, *args, **kwargs)
+        elif "flight" == data_stream["source"]:
+            stream = FlightDataStream(data_stream, *args, **kwargs)
         elif "local_file" == data_stream["source"]:
-            return LocalDataStream(data_stream, *args, **kwargs)
+            stream = LocalDataStream(data_stream, *args, **kwargs)
         else:
             raise Exception(
-                f"Invalid data stream source type: {data_stream['source']}. Source can only have one of the two values: [modelardb, local_file]"
+                f"Invalid data stream source type: {data_stream['source']}. Source can only have one of the three values: [modelardb, flight, local_file]"
             )
+
+        if data_dir and data_stream.get("cache_size_mb"):
+            stream.batch_cache_ = BatchCache(
+                os.path.join(data_dir, "cache"),
+                data_stream["cache_size_mb"] * 1024 * 1024,
+            )
+        stream.batch_size_controller_ = create_batch_size_controller(
+            data_stream, exp_dir
+        )
+        stream.memory_budget_ = create_memory_budget(data_stream)
+        return stream
@@ -0,0 +1,78 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="ModelCache", package_name=None)
+
+
+class ModelCache:
+    """
+    Process-wide LRU cache of deserialized models, shared by all jobs.
+
+    Entries are keyed by the resolved model path together with the mtime and
+    size of the saved artifact, so a model saved again under the same path is
+    loaded again. The cache is bounded by `max_models` and by the estimated
+    bytes of the entries, taken from the size of the artifact on disk. Every
+    checkout returns a deep copy, so jobs can train the model they receive
+    without changing the cached instance.
+    """
+
+    def __init__(self, max_models, max_bytes) -> None:
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get_key(self, model_path):
+        path = os.path.realpath(model_path)
+        mtime, size = get_artifact_stats(path)
+        return (path, mtime, size), size
+
+    def checkout(self, model_path, load_model):
+        key, size = self.get_key(model_path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                LOGGER.debug(f"Model cache hit: {model_path}")
+                return copy.deepcopy(entry[0])
+
+        model = load_model(model_path)
+        self.put(key, model, size)
+        return copy.deepcopy(model)
+
+    def put(self, key, model, size):
+        if self.max_models <= 0 or size > self.max_bytes:
+            return
+
+        with self.lock:
+            # drop older versions of the same model path
+            for old_key in [k for k in self.entries if k[0] == key[0]]:
+                self.total_bytes -= self.entries.pop(old_key)[1]
+
+            self.entries[key] = (model, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_models or (
+                self.total_bytes > self.max_bytes
+            ):
+                old_key, (_, old_size) = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                LOGGER.debug(f"Evicted cached model: {old_key[0]}")
+
+
+def get_artifact_stats(path):
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    mtime, size = os.stat(path).st_mtime_ns, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            mtime = max(mtime, stat.st_mtime_ns)
+            size += stat.st_size
+    return mtime, size
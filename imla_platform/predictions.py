@@ -0,0 +1,183 @@
+import os
+import time
+
+import numpy as np
+import pyarrow
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="IMLA Platform", package_name=None)
+
+PREDICTIONS_FILE = "predictions.arrow"
+EVALUATION_FILE = "evaluation.arrow"
+PREDICTIONS_STREAM_FILE = "predictions.arrows"
+
+
+def to_float(value):
+    """
+    Returns NaN for missing values and raises ValueError for values that are
+    not numeric, e.g. the string labels of a classification.
+    """
+    if value is None:
+        return np.nan
+    if isinstance(value, (str, bytes)):
+        raise ValueError(f"Not a numeric value: {value!r}")
+    try:
+        return float(value)
+    except TypeError:
+        raise ValueError(f"Not a numeric value: {value!r}")
+
+
+def create_predictions_table(predictions, actuals=None):
+    """
+    Converts the predictions keyed by epoch seconds (or row index) into a table
+    with int64 timestamp, prediction and actual columns sorted by timestamp.
+    Raises ValueError if a key is not an integer or a value is not numeric.
+    """
+    actuals = actuals or {}
+    timestamps = np.fromiter(
+        (int(key) for key in predictions), dtype=np.int64, count=len(predictions)
+    )
+    values = np.fromiter(
+        (to_float(value) for value in predictions.values()),
+        dtype=np.float64,
+        count=len(predictions),
+    )
+    actual_values = np.fromiter(
+        (to_float(actuals.get(key)) for key in predictions),
+        dtype=np.float64,
+        count=len(predictions),
+    )
+
+    order = np.argsort(timestamps, kind="stable")
+    return pyarrow.table(
+        {
+            "timestamp": timestamps[order],
+            "prediction": values[order],
+            "actual": actual_values[order],
+        }
+    )
+
+
+def create_evaluation_table(evaluation):
+    metrics = list(evaluation.keys())
+    return pyarrow.table(
+        {
+            "metric": pyarrow.array(metrics, type=pyarrow.string()),
+            "value": pyarrow.array(
+                [float(evaluation[metric]) for metric in metrics],
+                type=pyarrow.float64(),
+            ),
+        }
+    )
+
+
+def write_table(path, table):
+    with pyarrow.OSFile(path, "wb") as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class PredictionWriter:
+    """
+    Appends the predictions of a job to an Arrow IPC stream in its experiment
+    directory while the job runs, so memory stays bounded by `buffer_rows`
+    whatever the length of the data stream.
+
+    Buffered predictions are written and fsynced once `buffer_rows` is reached
+    or `fsync_interval` seconds have passed, whichever comes first, so a killed
+    worker loses at most that much. The stream is left on disk by `abort`, so
+    the predictions written before a failure survive.
+    `close` converts the stream into the predictions.arrow file, sorted by
+    timestamp, and removes it.
+    """
+
+    def __init__(self, exp_dir, buffer_rows, fsync_interval) -> None:
+        self.exp_dir = exp_dir
+        self.buffer_rows = buffer_rows
+        self.fsync_interval = fsync_interval
+        self.stream_path = os.path.join(exp_dir, PREDICTIONS_STREAM_FILE)
+        self.file_ = None
+        self.writer_ = None
+        self.buffer_ = []
+        self.buffered_rows_ = 0
+        self.num_rows_ = 0
+        self.last_timestamp_ = None
+        self.ordered_ = True
+        self.last_fsync_ = time.perf_counter()
+
+    def write(self, predictions, actuals=None):
+        """
+        Buffers the predictions of one batch. Raises ValueError if they are not
+        numeric or not keyed by timestamps, before anything of the batch is
+        written.
+        """
+        if not predictions:
+            return
+
+        table = create_predictions_table(predictions, actuals)
+        timestamps = table.column("timestamp")
+        first, last = timestamps[0].as_py(), timestamps[-1].as_py()
+        if self.last_timestamp_ is not None:
+            # batches arriving out of order are sorted when the stream is closed
+            if first < self.last_timestamp_:
+                self.ordered_ = False
+            last = max(last, self.last_timestamp_)
+        self.last_timestamp_ = last
+
+        self.buffer_.append(table)
+        self.buffered_rows_ += table.num_rows
+        self.num_rows_ += table.num_rows
+        # slow streams are written at least every fsync_interval
+        if (
+            self.buffered_rows_ >= self.buffer_rows
+            or time.perf_counter() - self.last_fsync_ >= self.fsync_interval
+        ):
+            self.flush()
+
+    def flush(self, sync=False):
+        if self.buffer_:
+            table = pyarrow.concat_tables(self.buffer_)
+            if self.writer_ is None:
+                self.file_ = open(self.stream_path, "wb")
+                self.writer_ = pyarrow.ipc.new_stream(self.file_, table.schema)
+            self.writer_.write_table(table)
+            self.buffer_ = []
+            self.buffered_rows_ = 0
+
+        if self.file_ is not None and (
+            sync or time.perf_counter() - self.last_fsync_ >= self.fsync_interval
+        ):
+            self.file_.flush()
+            os.fsync(self.file_.fileno())
+            self.last_fsync_ = time.perf_counter()
+
+    def close(self):
+        self.abort()
+        path = os.path.join(self.exp_dir, PREDICTIONS_FILE)
+        if not os.path.exists(self.stream_path):
+            write_table(path, create_predictions_table({}))
+            return
+
+        with pyarrow.memory_map(self.stream_path) as source:
+            reader = pyarrow.ipc.open_stream(source)
+            with pyarrow.OSFile(path + ".tmp", "wb") as sink:
+                with pyarrow.ipc.new_file(sink, reader.schema) as writer:
+                    if self.ordered_:
+                        # batches are copied one at a time
+                        for batch in reader:
+                            writer.write_batch(batch)
+                    else:
+                        writer.write_table(reader.read_all().sort_by("timestamp"))
+        os.replace(path + ".tmp", path)
+        os.remove(self.stream_path)
+        LOGGER.debug(f"Predictions written: {self.num_rows_} rows")
+
+    def abort(self):
+        if self.writer_ is None and not self.buffer_:
+            return
+
+        self.flush(sync=True)
+        self.writer_.close()
+        self.file_.close()
+        self.writer_ = None
+        self.file_ = None
@@ -0,0 +1,107 @@
+from imla_platform.resampling import interval_to_nanoseconds
+
+SQL_AGGREGATIONS = {
+    "mean": "AVG({column})",
+    "min": "MIN({column})",
+    "max": "MAX({column})",
+    "last": "LAST_VALUE({column} ORDER BY {timestamp_col})",
+}
+
+
+def interval_to_sql(time_interval):
+    """
+    Converts a fixed pandas frequency to a SQL interval literal or returns None
+    if the frequency cannot be expressed in whole milliseconds.
+    """
+    nanoseconds = interval_to_nanoseconds(time_interval)
+    if not nanoseconds or nanoseconds % 1_000_000 != 0:
+        return None
+    return f"INTERVAL '{nanoseconds // 1_000_000} milliseconds'"
+
+
+def build_where_clause(
+    timestamp_col, from_date=None, to_date=None, to_inclusive=True, from_inclusive=True
+):
+    conditions = []
+    if from_date:
+        conditions.append(
+            f"{timestamp_col} {'>=' if from_inclusive else '>'} '{from_date}'"
+        )
+    if to_date:
+        conditions.append(
+            f"{timestamp_col} {'<=' if to_inclusive else '<'} '{to_date}'"
+        )
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def build_select_query(
+    model_table,
+    columns=None,
+    timestamp_col=None,
+    from_date=None,
+    to_date=None,
+    to_inclusive=True,
+    from_inclusive=True,
+    order_by_time=False,
+    limit=None,
+):
+    query = f"SELECT {', '.join(columns) if columns else '*'} FROM {model_table}"
+    query += build_where_clause(
+        timestamp_col, from_date, to_date, to_inclusive, from_inclusive
+    )
+    if order_by_time:
+        query += f" ORDER BY {timestamp_col}"
+    if limit:
+        query += f" LIMIT {limit}"
+    return query
+
+
+def build_aggregate_query(
+    model_table,
+    timestamp_col,
+    value_columns,
+    group_columns,
+    time_interval,
+    aggregation="mean",
+    from_date=None,
+    to_date=None,
+    to_inclusive=True,
+    limit=None,
+):
+    """
+    Builds a query that downsamples `value_columns` into epoch aligned buckets of
+    `time_interval` per distinct combination of `group_columns` (e.g. tags).
+    `limit` is applied to the raw rows before they are aggregated.
+    """
+    bucket = f"date_bin({interval_to_sql(time_interval)}, {timestamp_col}, TIMESTAMP '1970-01-01T00:00:00')"
+    aggregates = [
+        SQL_AGGREGATIONS[aggregation].format(column=column, timestamp_col=timestamp_col)
+        + f" AS {column}"
+        for column in value_columns
+    ]
+
+    if limit:
+        source = (
+            "("
+            + build_select_query(
+                model_table,
+                timestamp_col=timestamp_col,
+                from_date=from_date,
+                to_date=to_date,
+                to_inclusive=to_inclusive,
+                order_by_time=True,
+                limit=limit,
+            )
+            + ") AS raw"
+        )
+    else:
+        source = model_table + build_where_clause(
+            timestamp_col, from_date, to_date, to_inclusive
+        )
+
+    return (
+        f"SELECT {', '.join([f'{bucket} AS {timestamp_col}'] + group_columns + aggregates)}"
+        f" FROM {source}"
+        f" GROUP BY {', '.join([bucket] + group_columns)}"
+        f" ORDER BY {timestamp_col}"
+    )
@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+from more_utils.logging import configure_logger
+from pandas.tseries.frequencies import to_offset
+
+LOGGER = configure_logger(logger_name="DataStream", package_name=None)
+
+AGGREGATIONS = ["mean", "min", "max", "last"]
+
+
+def interval_to_nanoseconds(time_interval):
+    """
+    Returns the length of a fixed pandas frequency (e.g. 2S, 5T, 1H) in
+    nanoseconds or None for calendar frequencies such as months.
+    """
+    try:
+        return int(pd.Timedelta(to_offset(time_interval)).value)
+    except ValueError:
+        return None
+
+
+class StreamingResampler:
+    """
+    Resamples a stream of time-series batches into fixed-size time buckets.
+
+    Numeric columns are aggregated per distinct combination of the remaining
+    label columns (e.g. tags), so every labelled series keeps its own buckets
+    like the aggregation pushed down to ModelarDB. Running partial aggregates
+    are kept for the bucket of every series that is still open at the end of
+    a batch, so buckets spanning two batches are aggregated once over all of
+    their rows. Only closed buckets are returned by `update`; the last open
+    buckets are returned by `flush` at the end of the stream. Buckets without
+    any rows are not emitted and buckets are aligned to the Unix epoch.
+    """
+
+    def __init__(self, time_interval, timestamp_col, aggregation="mean") -> None:
+        if aggregation not in AGGREGATIONS:
+            raise Exception(
+                f"Invalid aggregation: {aggregation}. Aggregation can only have one of the values: {AGGREGATIONS}"
+            )
+
+        self.interval = interval_to_nanoseconds(time_interval)
+        if not self.interval:
+            raise Exception(
+                f"Invalid time interval: {time_interval}. Only fixed frequencies can be resampled on a stream."
+            )
+
+        self.timestamp_col = timestamp_col
+        self.aggregation = aggregation
+
+        self.columns = None
+        self.numeric_columns = None
+        self.label_columns = None
+        # open bucket and its partial aggregates per series
+        self.open_buckets = {}
+
+    def update(self, df):
+        timestamps = to_int64_timestamps(df[self.timestamp_col])
+        valid_rows = timestamps != np.iinfo(np.int64).min
+        if not valid_rows.all():
+            df, timestamps = df[valid_rows], timestamps[valid_rows]
+
+        if self.columns is None:
+            self.columns = [
+                column for column in df.columns if column != self.timestamp_col
+            ]
+            self.numeric_columns = [
+                column
+                for column in self.columns
+                if pd.api.types.is_numeric_dtype(df[column].dtype)
+            ]
+            self.label_columns = [
+                column for column in self.columns if column not in self.numeric_columns
+            ]
+
+        if len(timestamps) == 0:
+            return self.empty_frame()
+
+        if not np.all(timestamps[1:] >= timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            df, timestamps = df.iloc[order], timestamps[order]
+
+        buckets = timestamps // self.interval
+        values = df[self.numeric_columns].to_numpy(dtype=np.float64)
+
+        frames, n_late_rows = [], 0
+        for labels, positions in self.group_rows(df):
+            closed, n_late = self.update_series(
+                labels, values[positions], buckets[positions]
+            )
+            n_late_rows += n_late
+            if closed is not None:
+                frames.append(self.to_frame(*closed, labels))
+
+        if n_late_rows:
+            LOGGER.warning(
+                f"Dropped {n_late_rows} late rows of time buckets that were already emitted."
+            )
+        return self.concat(frames)
+
+    def group_rows(self, df):
+        if not self.label_columns:
+            return [((), np.arange(len(df)))]
+
+        groups = df.groupby(
+            self.label_columns, sort=False, dropna=False, observed=True
+        ).indices
+        return [
+            (
+                tuple(
+                    None if pd.isna(label) else label
+                    for label in (labels if isinstance(labels, tuple) else (labels,))
+                ),
+                positions,
+            )
+            for labels, positions in groups.items()
+        ]
+
+    def update_series(self, labels, values, buckets):
+        """
+        Adds the rows of one series to its buckets and returns the ids and
+        partial aggregates of the buckets that were closed, if any, together
+        with the number of late rows that were dropped.
+        """
+        open_bucket, open_partials = self.open_buckets.get(labels, (None, None))
+
+        n_late = 0
+        if open_bucket is not None and buckets[0] < open_bucket:
+            # rows of buckets that were already emitted cannot be merged anymore
+            late_rows = buckets < open_bucket
+            n_late = int(late_rows.sum())
+            values, buckets = values[~late_rows], buckets[~late_rows]
+            if len(buckets) == 0:
+                return None, n_late
+
+        starts = np.r_[0, np.flatnonzero(np.diff(buckets)) + 1]
+        bucket_ids = buckets[starts]
+        partials = self.partials(values, starts)
+
+        if open_bucket is not None and bucket_ids[0] == open_bucket:
+            first = self.combine(open_partials, [p[:1] for p in partials])
+            partials = [np.concatenate([f, p[1:]]) for f, p in zip(first, partials)]
+        elif open_bucket is not None:
+            bucket_ids = np.r_[open_bucket, bucket_ids]
+            partials = [np.concatenate([o, p]) for o, p in zip(open_partials, partials)]
+
+        self.open_buckets[labels] = (bucket_ids[-1], [p[-1:] for p in partials])
+        if len(bucket_ids) == 1:
+            return None, n_late
+        return (bucket_ids[:-1], [p[:-1] for p in partials]), n_late
+
+    def flush(self):
+        frames = [
+            self.to_frame(np.array([open_bucket]), open_partials, labels)
+            for labels, (open_bucket, open_partials) in self.open_buckets.items()
+        ]
+        self.open_buckets = {}
+        if self.columns is None:
+            return pd.DataFrame()
+        return self.concat(frames)
+
+    def concat(self, frames):
+        if not frames:
+            return self.empty_frame()
+        elif len(frames) == 1:
+            return frames[0]
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values(self.timestamp_col, kind="stable", ignore_index=True)
+
+    def partials(self, values, starts):
+        valid = ~np.isnan(values)
+        if self.aggregation == "mean":
+            return [
+                np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0),
+                np.add.reduceat(valid.astype(np.int64), starts, axis=0),
+            ]
+        elif self.aggregation == "min":
+            return [np.fmin.reduceat(values, starts, axis=0)]
+        elif self.aggregation == "max":
+            return [np.fmax.reduceat(values, starts, axis=0)]
+        else:
+            positions = np.where(valid, np.arange(len(values))[:, None], -1)
+            last_positions = np.maximum.reduceat(positions, starts, axis=0)
+            found = last_positions >= starts[:, None]
+            last_values = np.take_along_axis(
+                values, np.maximum(last_positions, 0), axis=0
+            )
+            return [np.where(found, last_values, np.nan), found]
+
+    def combine(self, old, new):
+        if self.aggregation == "mean":
+            return [old[0] + new[0], old[1] + new[1]]
+        elif self.aggregation == "min":
+            return [np.fmin(old[0], new[0])]
+        elif self.aggregation == "max":
+            return [np.fmax(old[0], new[0])]
+        else:
+            return [np.where(new[1], new[0], old[0]), old[1] | new[1]]
+
+    def finalize(self, partials):
+        if self.aggregation == "mean":
+            sums, counts = partials
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(counts > 0, sums / counts, np.nan)
+        return partials[0]
+
+    def to_frame(self, bucket_ids, partials, labels):
+        values = self.finalize(partials)
+        data = {
+            self.timestamp_col: (bucket_ids * self.interval).astype("datetime64[ns]")
+        }
+        for i, column in enumerate(self.numeric_columns):
+            data[column] = values[:, i]
+        for column, label in zip(self.label_columns, labels):
+            data[column] = np.full(len(bucket_ids), label, dtype=object)
+        return pd.DataFrame(data, columns=[self.timestamp_col] + self.columns)
+
+    def empty_frame(self):
+        return self.to_frame(
+            np.empty(0, dtype=np.int64),
+            [np.empty((0, len(self.numeric_columns)))] * 2,
+            [None] * len(self.label_columns),
+        )
+
+
+def to_int64_timestamps(timestamps):
+    if pd.api.types.is_integer_dtype(timestamps.dtype):
+        return timestamps.to_numpy(dtype=np.int64)
+    return timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
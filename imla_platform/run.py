@@ -15,6 +15,8 @@ from more_utils.messaging import RabbitMQFactory
 from more_utils.persistence.modelardb import ModelarDB
 
 
+from imla_platform.model_cache import ModelCache
+from imla_platform.runtime import RayRuntime, get_worker_namespace
 from imla_platform.service import IMLAPlatform
 from imla_platform.validation import validate_host_and_port
 
@@ -67,11 +69,46 @@ def run_service(data_dir):
             f"Connected to Message Broker at {config.RABBITMQ_HOST}:{config.RABBITMQ_PORT}"
         )
 
+        ray_runtime = None
+        if config.RAY_PERSISTENT_RUNTIME:
+            ray_runtime = RayRuntime(
+                address=config.RAY_ADDRESS,
+                namespace=get_worker_namespace(config.RAY_NAMESPACE),
+                warmup=config.RAY_WARMUP,
+            )
+
+        inference_broker = None
+        if config.FORECASTING_INFERENCE_QUEUE:
+            inference_broker = RabbitMQFactory.create_context(
+                args={
+                    **broker_configs,
+                    "broker_request_queue": config.FORECASTING_INFERENCE_QUEUE,
+                }
+            )
+            LOGGER.info(
+                f"Listening for inference requests on: {config.FORECASTING_INFERENCE_QUEUE}"
+            )
+
+        model_cache = None
+        if config.MODEL_CACHE_SIZE > 0:
+            model_cache = ModelCache(
+                max_models=config.MODEL_CACHE_SIZE,
+                max_bytes=config.MODEL_CACHE_MAX_MB * 1024 * 1024,
+            )
+
         service = IMLAPlatform(
             modelardb_conn=modelardb_conn,
             message_broker=message_broker,
             data_dir=data_dir,
+            job_slots=config.FORECASTING_JOB_SLOTS,
+            ray_runtime=ray_runtime,
+            model_cache=model_cache,
+            inference_broker=inference_broker,
+            progress_interval=config.FORECASTING_PROGRESS_INTERVAL or None,
+            prediction_buffer_rows=config.FORECASTING_PREDICTION_BUFFER_ROWS,
+            prediction_fsync_interval=config.FORECASTING_PREDICTION_FSYNC_INTERVAL,
         )
+        LOGGER.info(f"Job slots available: {config.FORECASTING_JOB_SLOTS}")
         service.run()
     except KeyboardInterrupt:
         print(f"\n{service.name} terminated.")
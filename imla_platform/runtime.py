@@ -0,0 +1,78 @@
+import os
+import socket
+
+import ray
+from more_utils.logging import configure_logger
+
+LOGGER = configure_logger(logger_name="RayRuntime", package_name=None)
+
+WARMUP_MODULES = ["sail", "river"]
+
+
+@ray.remote
+def import_modules(modules):
+    for module in modules:
+        __import__(module)
+    return True
+
+
+class RayRuntime:
+    """
+    Ray runtime that is started once per worker and shared by all its jobs.
+
+    Keeps the raylet and the worker processes alive between jobs, so a job
+    does not pay Ray's cold start and the import of sail and river again.
+    Ray binds the namespace to the driver, so all jobs of a worker run in
+    `namespace`; named actors left in it are removed whenever the worker
+    becomes idle. Workers attached to the same cluster must therefore use
+    their own namespace, see `get_worker_namespace`.
+    """
+
+    def __init__(self, address=None, namespace=None, warmup=True) -> None:
+        self.address = address
+        self.namespace = namespace
+        self.warmup = warmup
+
+    def start(self):
+        ray.init(
+            address=self.address or None,
+            namespace=self.namespace or None,
+            ignore_reinit_error=True,
+        )
+        LOGGER.info(
+            f"Ray runtime started"
+            + (f" at {self.address}" if self.address else "")
+            + f". Resources: {ray.cluster_resources()}"
+        )
+        if self.warmup:
+            self.warm_up()
+
+    def warm_up(self):
+        n_workers = max(1, int(ray.available_resources().get("CPU", 1)))
+        try:
+            ray.get([import_modules.remote(WARMUP_MODULES) for _ in range(n_workers)])
+            LOGGER.info(f"Warmed up {n_workers} Ray workers.")
+        except Exception as e:
+            LOGGER.warning(f"Warming up Ray workers failed: {str(e)}")
+
+    def ensure_started(self):
+        if not ray.is_initialized():
+            LOGGER.warning("Ray runtime is not running anymore. Restarting...")
+            self.start()
+
+    def cleanup(self):
+        for name in ray.util.list_named_actors():
+            try:
+                ray.kill(ray.get_actor(name))
+                LOGGER.debug(f"Killed leftover Ray actor: {name}")
+            except ValueError:
+                pass
+
+    def shutdown(self):
+        ray.shutdown()
+
+
+def get_worker_namespace(prefix):
+    # unique per worker, so an idle worker only removes its own actors
+    worker = os.environ.get("POD_NAME") or f"{socket.gethostname()}-{os.getpid()}"
+    return f"{prefix}-{worker}"
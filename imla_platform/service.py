@@ -1,6 +1,8 @@
 from sail.models.auto_ml.auto_pipeline import SAILAutoPipeline
 from sail.pipeline import SAILPipeline
 import os
+import numpy as np
+from time import perf_counter
 from imla_platform.base import BaseService
 from imla_platform.parser import param_parser, flatten_list
 from more_utils.logging import configure_logger
@@ -9,28 +11,52 @@ LOGGER = configure_logger(logger_name="IMLA Platform", package_name=None)
 
 
 class IMLAPlatform(BaseService):
-    def __init__(self, modelardb_conn, message_broker, data_dir) -> None:
+    def __init__(
+        self,
+        modelardb_conn,
+        message_broker,
+        data_dir,
+        job_slots=1,
+        ray_runtime=None,
+        model_cache=None,
+        inference_broker=None,
+        progress_interval=1.0,
+        prediction_buffer_rows=10000,
+        prediction_fsync_interval=5.0,
+    ) -> None:
         super(IMLAPlatform, self).__init__(
             self.__class__.__name__,
             modelardb_conn,
             message_broker,
             data_dir,
+            job_slots,
+            ray_runtime,
+            inference_broker,
+            progress_interval,
+            prediction_buffer_rows,
+            prediction_fsync_interval,
         )
+        self.model_cache = model_cache
 
-    def load_or_create_model(self, configs, tracer):
+    def load_or_create_model(self, configs, job):
         if configs["model_path"]:
-            model = SAILAutoPipeline.load_model(configs["model_path"])
+            if self.model_cache is not None:
+                model = self.model_cache.checkout(
+                    configs["model_path"], SAILAutoPipeline.load_model
+                )
+            else:
+                model = SAILAutoPipeline.load_model(configs["model_path"])
             LOGGER.info(
                 f"SAILAutoPipeline loaded successfully from - [{configs['model_path']}]."
             )
-            model.pipeline_strategy.tracer = tracer
+            model.pipeline_strategy.tracer = job.tracer
         else:
-            model = self.create_model_instance(configs, tracer)
+            model = self.create_model_instance(configs, job)
             LOGGER.info("SAILAutoPipeline created successfully.")
 
         return model
 
-    def create_model_instance(self, configs, tracer):
+    def create_model_instance(self, configs, job):
         sail_auto_pipeline_params = {}
 
         try:
@@ -53,11 +79,11 @@ class IMLAPlatform(BaseService):
             )
 
             if os.environ.get("POD_NAME"):
-                exp_dir = self.exp_dir.split("/")[-1]
-                data_dir = self.exp_dir.replace(exp_dir, "")
+                exp_dir = job.exp_dir.split("/")[-1]
+                data_dir = job.exp_dir.replace(exp_dir, "")
                 storage_path = os.path.join(data_dir, os.environ.get("POD_NAME"), exp_dir)
             else:
-                storage_path = self.exp_dir
+                storage_path = job.exp_dir
 
             sail_auto_pipeline_params["search_method_params"]["storage_path"] = storage_path
             sail_auto_pipeline_params["search_data_size"] = configs["search_data_size"]
@@ -72,9 +98,9 @@ class IMLAPlatform(BaseService):
             sail_auto_pipeline_params["verbosity_interval"] = configs["verbosity_interval"]
 
             if configs["tensorboard_log_dir"]:
-                sail_auto_pipeline_params["tensorboard_log_dir"] = self.exp_dir
+                sail_auto_pipeline_params["tensorboard_log_dir"] = job.exp_dir
 
-            sail_auto_pipeline_params["tracer"] = tracer
+            sail_auto_pipeline_params["tracer"] = job.tracer
 
             return SAILAutoPipeline(**sail_auto_pipeline_params)
         
@@ -82,36 +108,68 @@ class IMLAPlatform(BaseService):
             LOGGER.error(f"Error in parsing configs: {str(e)}")
             raise Exception(f"Error in parsing configs: {str(e)}")
 
-    def process_ts_batch(self, model, ts_batch, target, timestamp_col, fit_params):
+    def process_ts_batch(
+        self,
+        model,
+        ts_batch,
+        target,
+        timestamp_col,
+        fit_params,
+        timings=None,
+        actuals=None,
+    ):
+        if timings is None:
+            timings = {}
+
         if not super(IMLAPlatform, self).process_ts_batch(
             ts_batch, timestamp_col
         ):
             return False
 
-        if timestamp_col:
-            indexes = ts_batch[timestamp_col]
-        else:
-            indexes = range(len(ts_batch))
-
         X = ts_batch.drop([target], axis=1)
         y = ts_batch[target]
 
-        predictions = {}
-        if model.best_pipeline:
-            preds = model.predict(X)
-            for index, pred in zip(indexes, preds):
-                try:
-                    predictions[str(int(index.timestamp()))] = pred
-                except:
-                    predictions[str(index)] = pred
+        predictions = self.predict(
+            model, X, ts_batch, timestamp_col, timings, y=y, actuals=actuals
+        )
 
         try:
+            start = perf_counter()
             model.train(X, y, **fit_params)
+            timings["train"] = perf_counter() - start
         except Exception as e:
             raise Exception(f"ERROR in SAIL: {str(e)}")
 
         return predictions
 
+    def predict_ts_batch(self, model, ts_batch, target, timestamp_col):
+        super(IMLAPlatform, self).process_ts_batch(ts_batch, timestamp_col)
+        X = ts_batch.drop([target], axis=1, errors="ignore")
+        return self.predict(model, X, ts_batch, timestamp_col)
+
+    def predict(
+        self, model, X, ts_batch, timestamp_col, timings=None, y=None, actuals=None
+    ):
+        if timings is None:
+            timings = {}
+
+        if timestamp_col:
+            indexes = ts_batch[timestamp_col]
+        else:
+            indexes = range(len(ts_batch))
+
+        predictions = {}
+        if model.best_pipeline:
+            start = perf_counter()
+            preds = model.predict(X)
+            timings["predict"] = perf_counter() - start
+            timestamp_unit = ts_batch.attrs.get("timestamp_unit")
+            keys = [prediction_key(index, timestamp_unit) for index in indexes]
+            predictions.update(zip(keys, preds))
+            if actuals is not None and y is not None:
+                actuals.update(zip(keys, y))
+        return predictions
+
     def send_response(self, json_message):
         super(IMLAPlatform, self).send_response(json_message)
 
@@ -121,3 +179,13 @@ class IMLAPlatform(BaseService):
     def run(self):
         super(IMLAPlatform, self).run()
         self.run_forever(self.process_time_series)
+
+
+def prediction_key(index, timestamp_unit=None):
+    try:
+        return str(int(index.timestamp()))
+    except:
+        if timestamp_unit == "ns" and isinstance(index, (int, np.integer)):
+            # compact batches carry int64 nanosecond timestamps
+            return str(int(index) // 10**9)
+        return str(index)